@@ -0,0 +1,212 @@
+"""Summary tables behind the dashboard views.
+
+data_prep.py materializes these into data/aggregates/ after every run, so
+pages read a few kilobytes instead of aggregating the full results and pit
+stop tables. utils falls back to the same functions when the tables are
+missing or were built by an older AGGREGATE_VERSION.
+"""
+import os
+import json
+import time
+import pandas as pd
+from schema import apply_schema
+from stints import stint_table
+
+AGGREGATE_DIR = os.path.join("data", "aggregates")
+MANIFEST_NAME = "manifest.json"
+
+# Bump when any table below changes shape or meaning; older tables are then ignored
+AGGREGATE_VERSION = 3
+
+# Schema table whose dtypes each aggregate's columns follow
+TABLE_SCHEMAS = {
+    'driver_stats': 'results',
+    'constructor_pit_stops': 'pit_stops',
+    'circuit_overtaking': 'results',
+    'season_points': 'results',
+    'stints': 'stints',
+    'driver_standings': 'driver_standings',
+}
+
+# Pit stops longer than this are red flags or repairs, not stops
+MAX_PIT_SECONDS = 40
+
+# Box plot whiskers reach the furthest point within WHISKER_IQR * IQR of the
+# box (Tukey, as plotly draws them); at most MAX_OUTLIERS distinct points
+# beyond them are kept per group, the most extreme first
+WHISKER_IQR = 1.5
+MAX_OUTLIERS = 25
+
+def driver_stats(results):
+    """Career aggregates per driver; `consistency` is the std of positionOrder."""
+    stats = results.groupby(['driverId', 'driver_name'], observed=True).agg(
+        total_races=('raceId', 'count'),
+        total_points=('points', 'sum'),
+        wins=('is_win', 'sum'),
+        podiums=('is_podium', 'sum'),
+        dnfs=('is_dnf', 'sum'),
+        avg_finish=('positionOrder', 'mean'),
+        consistency=('positionOrder', 'std'),
+        avg_gain=('position_gain', 'mean')
+    ).reset_index()
+    return add_rates(stats)
+
+def add_rates(stats):
+    stats['win_rate'] = stats['wins'] / stats['total_races']
+    stats['podium_rate'] = stats['podiums'] / stats['total_races']
+    stats['dnf_rate'] = stats['dnfs'] / stats['total_races']
+    stats['points_per_race'] = stats['total_points'] / stats['total_races']
+    return stats
+
+def constructor_pit_stops(results, pits, min_year=None, max_seconds=MAX_PIT_SECONDS):
+    """Pit stops under max_seconds with the constructor of the driver that stopped."""
+    if min_year is not None:
+        pits = pits[pits['year'] >= min_year]
+
+    # Ensure pits has constructor info
+    if 'constructor_name' not in pits.columns:
+        driver_team_map = results[['raceId', 'driverId', 'constructor_name']].drop_duplicates()
+        pits = pd.merge(pits, driver_team_map, on=['raceId', 'driverId'], how='inner')
+
+    # Filter for valid durations (< 40s) for pit stop speed analysis
+    pits_clean = pits[pits['milliseconds'] < max_seconds * 1000].copy()
+    pits_clean['seconds'] = pits_clean['milliseconds'] / 1000
+    return pits_clean
+
+def circuit_overtaking(results, min_races=1):
+    """Mean absolute grid-to-finish change per race name, pit-lane starts excluded."""
+    valid_res = results[results['grid'] > 0]
+    circuit_stats = valid_res.groupby('race_name', observed=True).agg(
+        overtaking_score=('position_gain', lambda x: x.abs().mean()),
+        races_held=('raceId', 'nunique')
+    ).reset_index()
+    return circuit_stats[circuit_stats['races_held'] >= min_races]
+
+def season_points(results):
+    """Each driver's points and running season total after every round."""
+    keys = ['year', 'round', 'raceId', 'race_name', 'driverId', 'driver_name']
+    # Shared drives put two result rows in one round
+    points = results[keys + ['points']].groupby(keys,
+                            observed=True, as_index=False)['points'].sum()
+    points = points.sort_values(['year', 'round', 'driverId'], kind='stable')
+    points['cumulative_points'] = points.groupby(['year', 'driverId'])['points'].cumsum()
+    return points.reset_index(drop=True)
+
+def driver_standings(standings):
+    """Official points total, position and wins of every driver after every round."""
+    keys = ['year', 'round', 'raceId', 'race_name', 'driverId', 'driver_name']
+    table = standings[keys + ['points', 'position', 'wins']]
+    return table.sort_values(['year', 'round', 'position'], kind='stable').reset_index(drop=True)
+
+def box_summary(df, by, value, max_outliers=MAX_OUTLIERS):
+    """Box plot statistics of value per group of by, in place of the raw rows.
+
+    Returns (summary, outliers): summary has one row per group with count,
+    mean, q1, median, q3 (linear quantiles, plotly's default) and the
+    lower/upper whisker ends; outliers holds the distinct values beyond the
+    whiskers. Both stay small however many rows df has. Groups keep their
+    order of first appearance, as px.box draws them.
+    """
+    if df.empty:
+        columns = [by, 'q1', 'median', 'q3', 'count', 'mean', 'lowerfence', 'upperfence']
+        return pd.DataFrame(columns=columns), pd.DataFrame(columns=[by, value])
+
+    grouped = df.groupby(by, observed=True, sort=False)[value]
+    summary = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    summary.columns = ['q1', 'median', 'q3']
+    summary['count'] = grouped.size()
+    summary['mean'] = grouped.mean()
+
+    # Fences per row, then the whisker ends are the extremes inside them
+    iqr = summary['q3'] - summary['q1']
+    low = df[by].map(summary['q1'] - WHISKER_IQR * iqr).astype(float).to_numpy()
+    high = df[by].map(summary['q3'] + WHISKER_IQR * iqr).astype(float).to_numpy()
+    values = df[value].to_numpy()
+    inside = (values >= low) & (values <= high)
+    within = df.loc[inside].groupby(by, observed=True)[value]
+    summary['lowerfence'] = within.min()
+    summary['upperfence'] = within.max()
+
+    outliers = df.loc[~inside, [by, value]].drop_duplicates()
+    outliers['distance'] = (outliers[value] - outliers[by].map(summary['median']).astype(float)).abs()
+    outliers = (outliers.sort_values('distance', ascending=False)
+                .groupby(by, observed=True).head(max_outliers)
+                .drop(columns='distance').sort_values([by, value]))
+    return summary.rename_axis(by).reset_index(), outliers.reset_index(drop=True)
+
+def build_aggregates(results, pits, laps=None, standings=None):
+    """All materialized tables, name -> DataFrame (keys match TABLE_SCHEMAS).
+
+    The stint table (stints.py) is only built when laps are given; data_prep.py
+    fits it from the lap export in chunks instead. The driver_standings table
+    needs the official standings export, which older sources lack.
+    """
+    tables = {
+        'driver_stats': driver_stats(results),
+        'constructor_pit_stops': constructor_pit_stops(results, pits),
+        'circuit_overtaking': circuit_overtaking(results),
+        'season_points': season_points(results),
+    }
+    if laps is not None:
+        tables['stints'] = stint_table(laps, pits, results)
+    if standings is not None:
+        tables['driver_standings'] = driver_standings(standings)
+    return tables
+
+def write_aggregates(tables, fmt='csv', data_version=None, out_dir=AGGREGATE_DIR):
+    """Write the tables plus a manifest recording AGGREGATE_VERSION and the data version.
+
+    The manifest is written last, so readers that check it never pick up a
+    half-written set.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    files = {}
+    for name, df in tables.items():
+        filename = f"{name}.{'parquet' if fmt == 'parquet' else 'csv'}"
+        path = os.path.join(out_dir, filename)
+        for stale in [f"{name}.parquet", f"{name}.csv"]:
+            if stale != filename and os.path.exists(os.path.join(out_dir, stale)):
+                os.remove(os.path.join(out_dir, stale))
+        if fmt == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+        files[name] = {'file': filename, 'rows': len(df)}
+
+    manifest = {
+        'version': AGGREGATE_VERSION,
+        'data_version': data_version,
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'tables': files,
+    }
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Aggregates written to {out_dir} ({', '.join(files)})")
+    return manifest
+
+def load_manifest(out_dir=AGGREGATE_DIR):
+    """The aggregate manifest, or None if missing or built by another AGGREGATE_VERSION."""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != AGGREGATE_VERSION:
+        return None
+    return manifest
+
+def read_aggregate(name, out_dir=AGGREGATE_DIR):
+    """One materialized table, or None when it is unavailable or outdated."""
+    manifest = load_manifest(out_dir)
+    if manifest is None or name not in manifest['tables']:
+        return None
+    path = os.path.join(out_dir, manifest['tables'][name]['file'])
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    return apply_schema(df, TABLE_SCHEMAS[name])
@@ -1,11 +1,12 @@
 import streamlit as st
 import pandas as pd
-from utils import load_data, inject_custom_css
+from utils import data_available, get_dataset_summary, begin_page, end_page, inject_custom_css
 
 st.set_page_config(
     page_title="F1 Analytics Hub",
     layout="wide"
 )
+begin_page("Home")
 
 inject_custom_css()
 
@@ -23,12 +24,11 @@ st.markdown("""
 
 col1, col2, col3 = st.columns(3)
 
-results, laps, pits = load_data()
-
-if results is not None:
-    total_races = results['raceId'].nunique()
-    total_drivers = results['driverId'].nunique()
-    total_laps = len(laps)
+if data_available():
+    summary = get_dataset_summary()
+    total_races = summary['races']
+    total_drivers = summary['drivers']
+    total_laps = summary['laps']
 
     col1.metric("Races Analyzed", total_races)
     col2.metric("Drivers Tracked", total_drivers)
@@ -88,3 +88,5 @@ This platform enables:
 
 **Data Coverage**: 70+ years of F1 history with over 1,000 races and millions of lap time data points.
 """)
+
+end_page()
@@ -0,0 +1,63 @@
+"""Memory-mapped Arrow IPC copies of the clean tables, shared across processes.
+
+Each table is one uncompressed Arrow IPC file. Opening it maps the file
+read-only instead of parsing it, so every Streamlit worker on the host reads
+the same physical pages from the OS cache; adding workers does not add
+copies of results, laps and pit stops. Fixed-width columns without nulls
+convert to pandas without copying.
+
+Built by `python scripts/data_prep.py --arrow` or `python arrow_store.py`.
+"""
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+
+ARROW_DIR = os.path.join("data", "arrow")
+TABLES = ['results', 'lap_times', 'pit_stops']
+
+def arrow_path(name, arrow_dir=ARROW_DIR):
+    return os.path.join(arrow_dir, f"{name}.arrow")
+
+def write_arrow(df, name, arrow_dir=ARROW_DIR):
+    """Write df as an Arrow IPC file, swapped in atomically.
+
+    Processes that mapped the previous file keep reading it (the old inode
+    lives on until they close it), so a rebuild never disturbs running pages.
+    """
+    os.makedirs(arrow_dir, exist_ok=True)
+    path = arrow_path(name, arrow_dir)
+    tmp_path = path + ".tmp"
+    # A single record batch, so each column maps as one contiguous buffer
+    table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    print(f"Arrow table written to {path} ({len(df):,} rows)")
+    return path
+
+def open_arrow(name, arrow_dir=ARROW_DIR):
+    """Memory-mapped pyarrow Table for name, or None if it has not been built."""
+    path = arrow_path(name, arrow_dir)
+    if not os.path.exists(path):
+        return None
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+def to_frame(table, columns=None, years=None):
+    """pandas view of a mapped table, projected to columns and seasons.
+
+    The unfiltered table converts zero-copy where Arrow allows it; a season
+    filter materializes only the selected rows.
+    """
+    if years is not None:
+        table = table.filter(pc.is_in(table['year'], value_set=pa.array([int(y) for y in years],
+                                                                        type=table.schema.field('year').type)))
+    if columns is not None:
+        table = table.select(list(columns))
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+if __name__ == "__main__":
+    from utils import read_table
+
+    for name in TABLES:
+        write_arrow(read_table(name), name)
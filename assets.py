@@ -0,0 +1,18 @@
+"""Encoded copies of dashboard files.
+
+`base64_of_file` encodes a file once per file version, for images and other
+files a page has to inline.
+"""
+import os
+import base64
+import functools
+
+@functools.lru_cache(maxsize=32)
+def _encoded(path, mtime_ns, size):
+    with open(path, 'rb') as f:
+        return base64.b64encode(f.read()).decode()
+
+def base64_of_file(path):
+    """Base64 of a file's bytes, read and encoded once per file version."""
+    stat = os.stat(path)
+    return _encoded(path, stat.st_mtime_ns, stat.st_size)
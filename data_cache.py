@@ -0,0 +1,237 @@
+"""Data-version-aware caching and hot reload for the dashboard.
+
+Cached helpers in utils are keyed on a fingerprint of the files under data/
+(the size and mtime of every clean export, aggregate, Arrow file and store),
+plus their own arguments. A background thread polls the fingerprint. When
+data_prep.py has written a new version and the files have stopped changing,
+the thread warms the registered caches for that version and then swaps the
+current version. Sessions keep being served from the old entries until the
+swap, so a refresh never causes a cold load. Stale entries are dropped by the
+per-function max_entries bound and the TTL.
+
+Built charts are cached the same way (`cached_figure`): their JSON is kept
+per page, chart, selection and data version in a size-bounded LRU, so a
+rerun only rebuilds the charts whose inputs changed.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import inspect
+import threading
+import functools
+import traceback
+from collections import OrderedDict
+import streamlit as st
+from timing import stage
+
+DATA_DIR = "data"
+
+# Seconds between fingerprint checks; F1_RELOAD_SECONDS=0 disables hot reload
+RELOAD_SECONDS = float(os.environ.get("F1_RELOAD_SECONDS", 10))
+
+# Defaults for versioned caches: entries expire after CACHE_TTL seconds and
+# each function keeps at most CACHE_MAX_ENTRIES argument/version combinations
+CACHE_TTL = 6 * 3600
+CACHE_MAX_ENTRIES = 64
+
+# Memory budget for serialized figures shared by all sessions of a process
+FIGURE_CACHE_MB = float(os.environ.get("F1_FIGURE_CACHE_MB", 64))
+
+# Generated inputs that the dashboard never reads
+IGNORED_DIRS = {'synthetic'}
+
+# Cached functions warmed before a new version goes live: (function, args list)
+_WARMUP = []
+
+# Version pinned for the calling thread while the watcher warms a new version,
+# so nested cached calls warm the same version
+_pinned = threading.local()
+
+def fingerprint(data_dir=DATA_DIR):
+    """Short hash of the path, size and mtime of every data file the dashboard can read.
+
+    Dot-prefixed and .tmp files are half-written outputs and are skipped.
+    """
+    entries = []
+    for root, dirs, files in os.walk(data_dir):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS and not d.startswith('.') and not d.endswith('.tmp'))
+        for name in sorted(files):
+            if name.startswith('.') or name.endswith('.tmp'):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # replaced while walking; the next check sees the new file
+            entries.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha1("\n".join(entries).encode()).hexdigest()[:16]
+
+class VersionWatcher:
+    """Holds the live data version and swaps it in the background once the next one is warm."""
+
+    def __init__(self, data_dir=DATA_DIR, interval=RELOAD_SECONDS):
+        self.data_dir = data_dir
+        self.interval = interval
+        self.current = fingerprint(data_dir)
+        self.reloads = 0
+        if interval > 0:
+            threading.Thread(target=self._run, name="data-version-watcher", daemon=True).start()
+
+    def _run(self):
+        pending = None
+        while True:
+            time.sleep(self.interval)
+            latest = fingerprint(self.data_dir)
+            if latest == self.current:
+                pending = None
+            elif latest != pending:
+                # data_prep may still be writing; wait one more interval for it to settle
+                pending = latest
+            else:
+                self.reload(latest)
+                pending = None
+
+    def reload(self, version):
+        """Warm every registered cache for version, then make it the live version."""
+        start = time.perf_counter()
+        warm_caches(version)
+        # A single attribute assignment: sessions see either the old or the new version
+        self.current = version
+        self.reloads += 1
+        print(f"Data version {version} live after {time.perf_counter() - start:.1f}s warm-up")
+
+@st.cache_resource
+def get_watcher():
+    """The process-wide VersionWatcher (one polling thread per server process)."""
+    return VersionWatcher()
+
+def current_version():
+    """Data version the calling thread should read (the live one outside warm-up)."""
+    return getattr(_pinned, 'version', None) or get_watcher().current
+
+def register_warmup(func, *arg_tuples):
+    """Also call func(*args) for each tuple (once with no args by default) while warming."""
+    _WARMUP.append((func, list(arg_tuples) or [()]))
+
+def warm_caches(version=None):
+    """Run every registered warm-up for version (default: the live one).
+
+    Returns (step, seconds) pairs in registration order. A failing step is
+    printed and skipped, so one broken table never blocks the rest.
+    """
+    _pinned.version = version or current_version()
+    timings = []
+    try:
+        for func, arg_list in _WARMUP:
+            for args in arg_list:
+                step = f"{func.__name__}({', '.join(map(repr, args))})"
+                start = time.perf_counter()
+                try:
+                    func(*args)
+                except Exception:
+                    print(traceback.format_exc())
+                timings.append((step, time.perf_counter() - start))
+    finally:
+        _pinned.version = None
+    return timings
+
+def versioned(kind='data', ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, warm=None):
+    """Cache a function with st.cache_data (or st.cache_resource) keyed on the data version.
+
+    Callers use the function unchanged; the current version is passed as a
+    hidden first argument, so a lookup only hashes the version token and the
+    (small) arguments. kind='resource' also skips the pickled copy on a hit:
+    callers get the cached object itself and must not modify it.
+
+    `warm` lists argument tuples to pre-compute for a new version before it
+    goes live (True means a single call with no args).
+    """
+    cache = st.cache_resource if kind == 'resource' else st.cache_data
+
+    def decorator(func):
+        def cached(version, *args, **kwargs):
+            return func(*args, **kwargs)
+        # Streamlit keys caches by module and qualname, so keep them per function
+        cached.__module__ = func.__module__
+        cached.__qualname__ = f"{func.__qualname__}@version"
+        cached = cache(ttl=ttl, max_entries=max_entries, show_spinner=False)(cached)
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Streamlit keys f(2014) and f(min_year=2014) apart; bind so every
+            # spelling of a call (including warm-up calls) shares one entry
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return cached(current_version(), *bound.args, **bound.kwargs)
+        wrapper.clear = cached.clear
+        if warm:
+            register_warmup(wrapper, *([] if warm is True else warm))
+        return wrapper
+    return decorator
+
+class FigureCache:
+    """LRU store of Plotly figure JSON, bounded by the total size of the stored strings."""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            payload = self.entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key, payload):
+        size = sys.getsizeof(payload)
+        if size > self.budget_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self.bytes -= sys.getsizeof(self.entries.pop(key))
+            self.entries[key] = payload
+            self.bytes += size
+            while self.bytes > self.budget_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= sys.getsizeof(evicted)
+
+    def stats(self):
+        return {'entries': len(self.entries), 'mb': round(self.bytes / 1e6, 2),
+                'hits': self.hits, 'misses': self.misses}
+
+@st.cache_resource
+def get_figure_cache():
+    """The process-wide FigureCache (FIGURE_CACHE_MB, env F1_FIGURE_CACHE_MB)."""
+    return FigureCache(int(FIGURE_CACHE_MB * 1e6))
+
+def cached_figure(page, chart, params, build):
+    """Figure from build(), reused across reruns while page, chart, params and the data version match.
+
+    build() should fetch its own data, so a hit skips that as well as the
+    px.* and format_fig work. params must be JSON-serializable (lists are fine).
+    A hit rebuilds the figure from its stored JSON, roughly a quarter of the
+    cost of building it.
+    """
+    import plotly.io as pio
+
+    key = (page, chart, json.dumps(params, sort_keys=True, default=str), current_version())
+    cache = get_figure_cache()
+    payload = cache.get(key)
+    if payload is not None:
+        with stage(f"figure {chart} (cached)"):
+            return pio.from_json(payload)
+    with stage(f"figure {chart}"):
+        fig = build()
+        cache.put(key, pio.to_json(fig, validate=False))
+    return fig
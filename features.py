@@ -0,0 +1,65 @@
+"""Derived result features, computed once at ingest by data_prep.py.
+
+The clean results export carries these columns, so the dashboard and the
+analytics scripts read them instead of recomputing them on every start.
+"""
+import numpy as np
+import pandas as pd
+
+# Status ids 1 (Finished) and 11-19 (+N Laps) count as classified finishes.
+# Only used when status.csv is unavailable or lacks an id.
+FINISHED_STATUS_IDS = [1] + list(range(11, 20))
+
+# status_category -> pattern over the status.csv text, checked in order;
+# anything unmatched is a mechanical retirement (Engine, Gearbox, Brakes, ...)
+STATUS_PATTERNS = {
+    'Finished': r'^Finished$',
+    'Lapped': r'^\+\d+ Laps?$|^Lapped$',
+    'Accident': r'Accident|Collision|Spun off|Crash',
+    'Disqualified': r'Disqualified|Excluded|Underweight',
+    'Not classified': r'Not classified',
+    'Did not start': r'Did not|Withdrew|Not restarted|107%',
+}
+STATUS_CATEGORIES = list(STATUS_PATTERNS) + ['Mechanical']
+CLASSIFIED_CATEGORIES = ['Finished', 'Lapped']
+
+def status_categories(status):
+    """statusId -> (status, status_category) frame built from status.csv.
+
+    Classifies the ~140 distinct status strings once; results pick up the
+    category through a join, so no string matching runs per result row.
+    """
+    status = status[['statusId', 'status']].copy()
+    category = np.full(len(status), 'Mechanical', dtype=object)
+    unmatched = np.ones(len(status), dtype=bool)
+    for name, pattern in STATUS_PATTERNS.items():
+        hit = unmatched & status['status'].str.contains(pattern, case=False, regex=True, na=False).to_numpy()
+        category[hit] = name
+        unmatched &= ~hit
+    status['status'] = status['status'].astype('category')
+    status['status_category'] = pd.Categorical(category, categories=STATUS_CATEGORIES)
+    return status
+
+def add_result_features(results, status=None):
+    """Add position_gain, is_win, is_podium, status, status_category and is_dnf.
+
+    position_gain is grid - positionOrder for every row, pit-lane starts (grid 0)
+    included; views that exclude them filter on grid. is_dnf is every result not
+    classified as Finished or Lapped; ids missing from status fall back to
+    FINISHED_STATUS_IDS.
+    """
+    grid = results['grid'].to_numpy()
+    position_order = results['positionOrder'].to_numpy()
+    results['position_gain'] = grid - position_order
+    results['is_win'] = (position_order == 1).astype('int8')
+    results['is_podium'] = (position_order <= 3).astype('int8')
+
+    finished = results['statusId'].isin(FINISHED_STATUS_IDS).to_numpy()
+    if status is not None and not status.empty:
+        results = results.drop(columns=['status', 'status_category'], errors='ignore')
+        results = pd.merge(results, status_categories(status), on='statusId', how='left')
+        known = results['status_category'].notna().to_numpy()
+        classified = results['status_category'].isin(CLASSIFIED_CATEGORIES).to_numpy()
+        finished = np.where(known, classified, finished)
+    results['is_dnf'] = (~finished).astype('int8')
+    return results
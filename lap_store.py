@@ -0,0 +1,95 @@
+"""Memory-mapped per-race lap store.
+
+Laps are sorted by (raceId, driverId, lap) and saved as one .npy file per
+column, plus a raceId -> (start, end) offset index. Opening the store maps the
+column files read-only, so selecting a race is an O(1) zero-copy slice instead
+of a boolean scan over every lap in history, and all server processes share
+the same pages through the OS cache.
+
+Built by `python scripts/data_prep.py --lap-store` or `python lap_store.py`.
+"""
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+STORE_DIR = os.path.join("data", "lap_store")
+
+# Stored columns; position 0 means "not recorded"
+COLUMNS = {
+    'driverId': 'int32',
+    'lap': 'int16',
+    'position': 'int16',
+    'milliseconds': 'int32',
+}
+
+def build_lap_store(laps, store_dir=STORE_DIR):
+    """Sort laps and write the column files and race offset index.
+
+    The new store is written next to the old one and swapped in; processes
+    that already mapped the old files keep reading them until they reopen.
+    """
+    laps = laps.sort_values(['raceId', 'driverId', 'lap'], kind='stable')
+    race_ids = laps['raceId'].to_numpy()
+    if len(race_ids):
+        starts = np.flatnonzero(np.r_[True, race_ids[1:] != race_ids[:-1]])
+    else:
+        starts = np.array([], dtype='int64')
+    ends = np.r_[starts[1:], len(race_ids)].astype('int64')
+
+    tmp_dir = store_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    index = np.column_stack([race_ids[starts], starts, ends]).astype('int64')
+    np.save(os.path.join(tmp_dir, "race_index.npy"), index)
+    for col, dtype in COLUMNS.items():
+        if col in laps.columns:
+            values = pd.to_numeric(laps[col], errors='coerce').fillna(0).to_numpy(dtype=dtype)
+        else:
+            values = np.zeros(len(laps), dtype=dtype)
+        np.save(os.path.join(tmp_dir, f"{col}.npy"), values)
+
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+    print(f"Lap store written to {store_dir} ({len(laps):,} laps, {len(index)} races)")
+    return store_dir
+
+class LapStore:
+    """Read-only view over a lap store directory."""
+
+    def __init__(self, store_dir=STORE_DIR):
+        index = np.load(os.path.join(store_dir, "race_index.npy"))
+        self.offsets = {int(race_id): (int(start), int(end)) for race_id, start, end in index}
+        self.columns = {
+            col: np.load(os.path.join(store_dir, f"{col}.npy"), mmap_mode='r')
+            for col in COLUMNS
+        }
+
+    def __contains__(self, race_id):
+        return int(race_id) in self.offsets
+
+    def __len__(self):
+        return len(self.columns['lap'])
+
+    def race_slice(self, race_id):
+        """Zero-copy column views for one race (empty views for unknown races)."""
+        start, end = self.offsets.get(int(race_id), (0, 0))
+        return {col: values[start:end] for col, values in self.columns.items()}
+
+    def race_frame(self, race_id):
+        """One race as a DataFrame shaped like the clean lap_times rows."""
+        df = pd.DataFrame(self.race_slice(race_id))
+        df.insert(0, 'raceId', np.int32(race_id))
+        df['position'] = df['position'].astype('Int16').mask(df['position'] == 0)
+        return df
+
+def open_lap_store(store_dir=STORE_DIR):
+    """LapStore for store_dir, or None if it has not been built."""
+    if not os.path.exists(os.path.join(store_dir, "race_index.npy")):
+        return None
+    return LapStore(store_dir)
+
+if __name__ == "__main__":
+    from utils import read_table
+
+    build_lap_store(read_table("lap_times", columns=['raceId'] + list(COLUMNS)))
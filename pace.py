@@ -0,0 +1,81 @@
+"""Rolling and exponentially smoothed lap pace for every window at once.
+
+The lap-time trace smooths each driver's laps with a rolling mean whose
+window the user picks. Instead of a per-driver rolling transform for every
+pick, `add_pace_columns` computes all windows in one pass over a race: with
+the cumulative sum C of lap times (restarted per driver), the mean of the
+last w laps ending at row i is (C[i] - C[i-w]) / w. Optional exponentially
+weighted means (pandas' ewm(span).mean(), adjust=True) are computed for all
+spans together, one lap position at a time across all drivers.
+
+Results match groupby(by)[value].rolling(w).mean() and .ewm(span=w).mean():
+a driver's first w-1 laps have no rolling value.
+"""
+import numpy as np
+import pandas as pd
+
+WINDOWS = list(range(1, 11))
+
+def _segments(keys):
+    """Start row of each row's segment of equal consecutive keys."""
+    n = len(keys)
+    if n == 0:
+        return np.array([], dtype='int64')
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return np.repeat(starts, np.diff(np.r_[starts, n]))
+
+def rolling_means(values, keys, windows=WINDOWS):
+    """{w: rolling mean of values over the last w rows of the same key}.
+
+    values and keys must be sorted so each key's rows are consecutive and in order.
+    """
+    values = np.asarray(values, dtype='float64')
+    keys = np.asarray(keys)
+    n = len(values)
+    cumulative = np.r_[0.0, np.cumsum(values)]
+    position = np.arange(n) - _segments(keys)
+    means = {}
+    for w in windows:
+        out = np.full(n, np.nan)
+        rows = np.flatnonzero(position >= w - 1)
+        out[rows] = (cumulative[rows + 1] - cumulative[rows + 1 - w]) / w
+        means[w] = out
+    return means
+
+def ewm_means(values, keys, spans):
+    """{span: exponentially weighted mean (adjust=True) within each key}, as rolling_means."""
+    values = np.asarray(values, dtype='float64')
+    keys = np.asarray(keys)
+    n = len(values)
+    if n == 0 or not spans:
+        return {s: np.full(n, np.nan) for s in spans}
+    starts = _segments(keys)
+    position = np.arange(n) - starts
+    segment = np.cumsum(np.r_[True, keys[1:] != keys[:-1]]) - 1
+
+    # Laps as a (segment, position) grid, so each step updates every driver at once
+    grid = np.full((segment[-1] + 1, position.max() + 1), np.nan)
+    grid[segment, position] = values
+    decay = 1 - 2 / (np.asarray(spans, dtype='float64') + 1)
+    numerator = np.zeros((len(spans), grid.shape[0]))
+    denominator = np.zeros_like(numerator)
+    smoothed = np.full((len(spans),) + grid.shape, np.nan)
+    for p in range(grid.shape[1]):
+        x = grid[:, p]
+        numerator = x + decay[:, None] * numerator
+        denominator = 1 + decay[:, None] * denominator
+        smoothed[:, :, p] = numerator / denominator
+    return {s: smoothed[i, segment, position] for i, s in enumerate(spans)}
+
+def add_pace_columns(laps, windows=WINDOWS, spans=(), by='driverId', value='milliseconds'):
+    """Sorted copy of laps with seconds, pace_<w> and ewm_<span> columns (seconds).
+
+    laps are one race's rows; every driver is smoothed separately.
+    """
+    laps = laps.sort_values([by, 'lap'], kind='stable').reset_index(drop=True)
+    seconds = laps[value].to_numpy(dtype='float64') / 1000
+    keys = laps[by].to_numpy()
+    columns = {'seconds': seconds}
+    columns.update({f"pace_{w}": m for w, m in rolling_means(seconds, keys, windows).items()})
+    columns.update({f"ewm_{s}": m for s, m in ewm_means(seconds, keys, list(spans)).items()})
+    return pd.concat([laps, pd.DataFrame(columns, index=laps.index)], axis=1)
@@ -1,74 +1,167 @@
 import streamlit as st
-import plotly.express as px
 import pandas as pd
-from utils import load_data, inject_custom_css, format_fig
+import plotly.express as px
+from rescoring import POINTS_SYSTEMS, RECORDED, FASTEST_LAP_POINTS, FASTEST_LAP_TOP
+from utils import data_available, get_seasons, default_season_index, get_season_standings, get_title_deciders, get_title_fight, get_rescored_champions, get_rescored_standings, cached_figure, begin_page, end_page, stage, inject_custom_css, format_fig
 
 st.set_page_config(page_title="Championship Dynamics", layout="wide")
+begin_page("Championship Dynamics")
 inject_custom_css()
 
 st.title("Championship Dynamics")
 
-results, _, _ = load_data()
-
-if results is not None:
+if data_available():
     # Select Year
-    years = sorted(results['year'].unique(), reverse=True)
-    selected_year = st.selectbox("Select Season", years, index=0 if 2021 not in years else years.index(2021))
-    
-    st.subheader(f"Title Fight Trajectory ({selected_year})")
-    
-    season_data = results[results['year'] == selected_year].copy()
+    years = get_seasons()
+    selected_year = st.selectbox("Select Season", years, index=default_season_index(years))
     
-    # Identify top 3 contenders
-    top_drivers = season_data.groupby('driverId')['points'].sum().sort_values(ascending=False).head(3).index
-    battle_data = season_data[season_data['driverId'].isin(top_drivers)].copy()
+    season = get_season_standings(selected_year)
+    max_contenders = min(10, max(2, len(season.driver_ids)))
+    if max_contenders > 2:
+        contenders = st.slider("Contenders", min_value=2, max_value=max_contenders, value=min(3, max_contenders))
+    else:
+        contenders = max_contenders
     
-    # Sort by round
-    battle_data = battle_data.sort_values('round')
-    
-    # Cumulative points
-    battle_data['cumulative_points'] = battle_data.groupby('driverId')['points'].cumsum()
-    
-    # Helper to get driver name (if missing from merge issues, but should be there)
-    # result csv has driver_name
+    st.subheader(f"Title Fight Trajectory ({selected_year})")
     
-    fig_battle = px.line(
-        battle_data, 
-        x='round', 
-        y='cumulative_points', 
-        color='driver_name', 
-        markers=True,
-        title=f"Points Accumulation: Top 3 Contenders",
-        labels={'cumulative_points': 'Total Points', 'round': 'Race Round'}
-    )
-    fig_battle = format_fig(fig_battle, "Championship Progression")
-    st.plotly_chart(fig_battle, use_container_width=True)
+    # Top contenders and their per-round running totals, sorted by round
+    top_drivers, battle_data = get_title_fight(selected_year, contenders=contenders)
+    
+    def battle_line():
+        fig_battle = px.line(
+            battle_data, 
+            x='round', 
+            y='cumulative_points', 
+            color='driver_name', 
+            markers=True,
+            title=f"Points Accumulation: Top {contenders} Contenders",
+            labels={'cumulative_points': 'Total Points', 'round': 'Race Round'}
+        )
+        if season.clinch_round is not None:
+            fig_battle.add_vline(x=season.clinch_round, line_dash='dash', line_color='gray',
+                                 annotation_text="Title clinched")
+        return format_fig(fig_battle, "Championship Progression")
+    
+    fig_battle = cached_figure("championship", "battle", {'year': selected_year, 'contenders': contenders}, battle_line)
+    with stage("plotly_chart battle"):
+        st.plotly_chart(fig_battle, use_container_width=True)
     
     # Gap Analysis
     st.subheader("Momentum Analysis")
-    # Pivot for gap calculation if only 2 top drivers
-    if len(top_drivers) >= 2:
-        pivot = battle_data[battle_data['driverId'].isin(top_drivers[:2])]
-        # Group by round, pivot driver names to columns
-        # Pivot table: Index=round, Columns=driver_name, Values=cumulative_points
-        try:
-            gap_pivot = pivot.pivot(index='round', columns='driver_name', values='cumulative_points')
-            d1 = gap_pivot.columns[0]
-            d2 = gap_pivot.columns[1]
-            gap_pivot['Gap'] = gap_pivot[d1] - gap_pivot[d2]
-            
+    if len(season.driver_ids) >= 2:
+        # Any two drivers of the season, the top two by default
+        names = dict(zip((int(d) for d in season.driver_ids), season.driver_names))
+        options = season.contenders(len(season.driver_ids))
+        col1, col2 = st.columns(2)
+        with col1:
+            driver_a = st.selectbox("Driver", options, index=0, format_func=names.get)
+        with col2:
+            driver_b = st.selectbox("Compared with", options, index=1, format_func=names.get)
+        
+        def gap_bar():
+            gap = pd.DataFrame({'round': season.rounds, 'Gap': season.gap_between(driver_a, driver_b)})
             fig_gap = px.bar(
-                gap_pivot, 
-                x=gap_pivot.index, 
+                gap, 
+                x='round', 
                 y='Gap',
-                title=f"Points Delta: {d1} vs {d2}",
+                title=f"Points Delta: {names[driver_a]} vs {names[driver_b]}",
                 color='Gap',
-                color_continuous_scale='RdBu'
+                color_continuous_scale='RdBu',
+                labels={'round': 'Race Round'}
             )
-            fig_gap = format_fig(fig_gap, "Points Delta")
+            return format_fig(fig_gap, "Points Delta")
+        
+        fig_gap = cached_figure("championship", "gap", {'year': selected_year, 'drivers': [driver_a, driver_b]}, gap_bar)
+        with stage("plotly_chart gap"):
             st.plotly_chart(fig_gap, use_container_width=True)
-        except Exception as e:
-            st.info("Could not generate gap chart (data shape complexity).")
+        
+        # When the title was settled: the first round after which no one else could reach the leader
+        if season.clinch_round is not None:
+            spare = len(season.rounds) - 1 - season.clinch_index
+            st.markdown(f"**Title clinched:** {season.driver_names[0]} after round {season.clinch_round} "
+                        f"({season.race_names[season.clinch_index]}), {spare} race(s) to spare")
+        elif season.dropped_scores:
+            st.markdown(f"**Title clinched:** not computed, {selected_year} counted only each driver's best "
+                        f"results; {season.driver_names[0]} won on the official total")
+        else:
+            st.markdown(f"**Title clinched:** not on points, {season.driver_names[0]} won on countback")
+        
+        # Rounds where the sole championship lead passed to another driver
+        changes = season.lead_changes()
+        st.markdown(f"**Lead changes:** {max(len(changes) - 1, 0)}")
+        st.dataframe(
+            changes.rename(columns={'round': 'Round', 'race_name': 'Race', 'driver_name': 'New Leader',
+                                    'previous_leader': 'Previous Leader'}).drop(columns='driverId'),
+            hide_index=True, use_container_width=True
+        )
+    
+    # Title deciders across every season
+    with st.expander("When Every Title Was Decided"):
+        deciders = get_title_deciders()
+        st.caption("Totals follow the official standings where the data has them. Seasons that "
+                   "dropped scores have no clinch round; sprint points count as available points.")
+        
+        def deciders_bar():
+            fig_deciders = px.bar(
+                deciders,
+                x='year',
+                y='rounds_to_spare',
+                hover_data=['driver_name', 'clinch_race', 'margin'],
+                title="Races to Spare When the Title Was Clinched",
+                labels={'year': 'Season', 'rounds_to_spare': 'Races to Spare'}
+            )
+            return format_fig(fig_deciders, "Races to Spare When the Title Was Clinched")
+        
+        fig_deciders = cached_figure("championship", "deciders", {}, deciders_bar)
+        with stage("plotly_chart deciders"):
+            st.plotly_chart(fig_deciders, use_container_width=True)
+        st.dataframe(
+            deciders.sort_values('year', ascending=False).rename(columns={
+                'year': 'Season', 'driver_name': 'Champion', 'rounds': 'Rounds', 'clinch_round': 'Clinched After Round',
+                'clinch_race': 'Clinched At', 'rounds_to_spare': 'Races to Spare', 'margin': 'Final Margin',
+                'dropped_scores': 'Dropped Scores', 'extra_points': 'Sprint Points'
+            }).drop(columns='driverId'),
+            hide_index=True, use_container_width=True
+        )
+    
+    # Alternative Points Systems
+    st.subheader("Alternative Points Systems")
+    st.caption("Every season re-scored with full points at every race; the fastest lap point "
+               "counts only where the fastest lap is recorded. Recorded is the official final "
+               "standings where the data has them.")
+    fastest_lap = st.checkbox(f"Add {FASTEST_LAP_POINTS} point for the fastest lap (top {FASTEST_LAP_TOP} finishers)")
+    systems = [RECORDED] + list(POINTS_SYSTEMS)
+    winners = get_rescored_champions()
+    winners = winners[(winners['fastest_lap'] == fastest_lap) | (winners['system'] == RECORDED)]
+    
+    def changed_bar():
+        changed = winners[winners['system'] != RECORDED].groupby('system', sort=False)['changed'].sum()
+        changed = changed.reindex(systems[1:]).reset_index()
+        fig_changed = px.bar(
+            changed,
+            x='system',
+            y='changed',
+            title="Seasons With a Different Champion",
+            labels={'system': 'Points System', 'changed': 'Seasons'}
+        )
+        return format_fig(fig_changed, "Seasons With a Different Champion")
+    
+    fig_changed = cached_figure("championship", "rescored", {'fastest_lap': fastest_lap}, changed_bar)
+    with stage("plotly_chart rescored"):
+        st.plotly_chart(fig_changed, use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Champion by Points System**")
+        champions_table = winners.pivot_table(index='year', columns='system', values='driver_name', aggfunc='first')
+        st.dataframe(champions_table[systems].sort_index(ascending=False), use_container_width=True)
+    with col2:
+        st.markdown(f"**{selected_year} Positions by Points System**")
+        rescored = get_rescored_standings()
+        rescored = rescored[(rescored['year'] == selected_year) &
+                            ((rescored['fastest_lap'] == fastest_lap) | (rescored['system'] == RECORDED))]
+        positions = rescored.pivot_table(index='driver_name', columns='system', values='position', aggfunc='min', observed=True)[systems]
+        st.dataframe(positions[positions.min(axis=1) <= 10].sort_values(RECORDED), use_container_width=True)
     
     st.markdown("---")
     
@@ -85,16 +178,17 @@ if results is not None:
     - **Points Gap Evolution**: Delta between leading drivers across the season
     - **Momentum Analysis**: Swing patterns and lead changes throughout the championship
     - **Top 3 Contender Identification**: Automatic identification of championship protagonists
+    - **Clinch & Elimination**: The round after which the title could no longer be lost, from the points still available (sprints included; not computed for dropped-score seasons)
     - **Race-by-Race Impact**: How individual race results influence overall standings
     - **Comparative Performance**: Side-by-side championship trajectories
     
     #### How We Are Doing It
     **Analytical Techniques:**
     1. **Season Filtering**: Select specific seasons to analyze historical championship battles
-    2. **Contender Identification**: Automatically identify top 3 drivers by total season points
+    2. **Contender Identification**: Identify the top contenders (3 by default) by total season points
     3. **Cumulative Summation**: Calculate running total of points after each race round
     4. **Line Chart Visualization**: Plot championship progression with markers for each race
-    5. **Gap Analysis**: Compute points delta between top 2 contenders using pivot tables
+    5. **Gap Analysis**: Compute points delta between any two drivers from precomputed season standings
     6. **Diverging Color Scale**: Use Red-Blue color scheme to show lead changes in gap chart
     
     #### What It Helps In
@@ -116,3 +210,5 @@ if results is not None:
     
     **Notable Examples**: 2021 Verstappen-Hamilton, 2008 Massa-Hamilton, 2007 Raikkonen-Hamilton-Alonso
     """)
+
+end_page()
@@ -1,75 +1,80 @@
 import streamlit as st
 import plotly.express as px
-import plotly.graph_objects as go
-from utils import load_data, get_driver_stats, inject_custom_css, format_fig
+from utils import data_available, get_driver_leaderboard, get_top_driver_finish_summary, box_figure, cached_figure, begin_page, end_page, stage, inject_custom_css, format_fig
 
 st.set_page_config(page_title="Driver Performance", layout="wide")
+begin_page("Driver Performance")
 inject_custom_css()
 
 st.title("Driver Performance Analytics")
 
-results, _, _ = load_data()
-
-if results is not None:
-    # career stats
-    stats = get_driver_stats(results)
-    
-    # Filter for active drivers (min races)
+if data_available():
+    # Filter for active drivers (min races); cached per slider value
     min_races = st.sidebar.slider("Minimum Races", 10, 100, 50)
-    active_stats = stats[stats['total_races'] >= min_races].copy()
+    
+    # Charts are built only when their own inputs change (cached_figure)
+    def efficiency_scatter():
+        fig_scatter = px.scatter(
+            get_driver_leaderboard(min_races), 
+            x='total_points', 
+            y='wins', 
+            size='win_rate',
+            hover_name='driver_name',
+            color='win_rate',
+            color_continuous_scale='Reds',
+            title=f"Career Efficiency Projection (> {min_races} Races)",
+            labels={'total_points': 'Total Points', 'wins': 'Career Wins'}
+        )
+        return format_fig(fig_scatter, "Efficiency Matrix")
     
     # 1. Career Points vs Wins Scatter
     st.subheader("Career Matrix: Wins vs Points")
-    fig_scatter = px.scatter(
-        active_stats, 
-        x='total_points', 
-        y='wins', 
-        size='win_rate',
-        hover_name='driver_name',
-        color='win_rate',
-        color_continuous_scale='Reds',
-        title=f"Career Efficiency Projection (> {min_races} Races)",
-        labels={'total_points': 'Total Points', 'wins': 'Career Wins'}
-    )
-    fig_scatter = format_fig(fig_scatter, "Efficiency Matrix")
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    fig_scatter = cached_figure("driver_performance", "efficiency", {'min_races': min_races}, efficiency_scatter)
+    with stage("plotly_chart scatter"):
+        st.plotly_chart(fig_scatter, use_container_width=True)
     
     # 2. Consistency Analysis
     st.subheader("Consistency Profiling (Position Variance)")
     
     top_n = st.slider("Select Top N Drivers", 5, 20, 10)
-    top_drivers = active_stats.sort_values('total_points', ascending=False).head(top_n)
-    
-    # Get all finish positions for these drivers
-    driver_finishes = results[results['driverId'].isin(top_drivers['driverId'])]
-    
-    fig_box = px.box(
-        driver_finishes, 
-        x='driver_name', 
-        y='positionOrder',
-        color='driver_name',
-        title=f"Finish Position Distribution (Top {top_n})",
-        labels={'positionOrder': 'Finish Position'}
-    )
-    fig_box.update_layout(showlegend=False)
-    fig_box = format_fig(fig_box, "Consistency Distribution")
-    st.plotly_chart(fig_box, use_container_width=True)
+    
+    def consistency_box():
+        # Quartiles and whiskers of the top N points scorers' finish positions
+        summary, outliers = get_top_driver_finish_summary(min_races, top_n)
+        fig_box = box_figure(
+            summary, 
+            outliers, 
+            'driver_name', 
+            'positionOrder',
+            title=f"Finish Position Distribution (Top {top_n})",
+            labels={'positionOrder': 'Finish Position'}
+        )
+        return format_fig(fig_box, "Consistency Distribution")
+    
+    fig_box = cached_figure("driver_performance", "consistency", {'min_races': min_races, 'top_n': top_n}, consistency_box)
+    with stage("plotly_chart box"):
+        st.plotly_chart(fig_box, use_container_width=True)
     
     # 3. Win vs DNF Tradeoff
     st.subheader("Reliability Analysis")
-    fig_risk = px.scatter(
-        active_stats, 
-        x='dnf_rate', 
-        y='win_rate', 
-        size='total_races',
-        hover_name='driver_name',
-        text='driver_name', # Labels might clutter if too many
-        title="Win Rate vs DNF Rate"
-    )
-    # Only label top performers to avoid clutter
-    fig_risk.update_traces(textposition='top center')
-    fig_risk = format_fig(fig_risk, "Reliability vs Performance")
-    st.plotly_chart(fig_risk, use_container_width=True)
+    
+    def reliability_scatter():
+        fig_risk = px.scatter(
+            get_driver_leaderboard(min_races), 
+            x='dnf_rate', 
+            y='win_rate', 
+            size='total_races',
+            hover_name='driver_name',
+            text='driver_name', # Labels might clutter if too many
+            title="Win Rate vs DNF Rate"
+        )
+        # Only label top performers to avoid clutter
+        fig_risk.update_traces(textposition='top center')
+        return format_fig(fig_risk, "Reliability vs Performance")
+    
+    fig_risk = cached_figure("driver_performance", "reliability", {'min_races': min_races}, reliability_scatter)
+    with stage("plotly_chart risk"):
+        st.plotly_chart(fig_risk, use_container_width=True)
 
     st.markdown("### Strategic Insights")
     st.info(f"**Consistency**: Narrower box plots indicate higher consistency (lower variance).")
@@ -118,3 +123,5 @@ if results is not None:
     - **Narrow Box Plots**: Highly consistent drivers who deliver predictable results
     - **Wide Box Plots**: Volatile performers with high peaks and low troughs
     """)
+
+end_page()
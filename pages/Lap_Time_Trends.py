@@ -1,22 +1,20 @@
 import streamlit as st
 import plotly.express as px
-import pandas as pd
-from utils import load_data, inject_custom_css, format_fig
+from utils import data_available, get_seasons, default_season_index, get_season_races, get_race_results, get_race_pace, cached_figure, begin_page, end_page, stage, inject_custom_css, format_fig
 
 st.set_page_config(page_title="Lap Time Trends", layout="wide")
+begin_page("Lap Time Trends")
 inject_custom_css()
 
 st.title("Lap Time Analysis")
 
-results, laps, _ = load_data()
-
-if results is not None and laps is not None:
+if data_available():
     # Select Race
     # Filter for year first to reduce list
-    years = sorted(results['year'].unique(), reverse=True)
-    sel_year = st.sidebar.selectbox("Select Season", years, index=years.index(2021) if 2021 in years else 0)
+    years = get_seasons()
+    sel_year = st.sidebar.selectbox("Select Season", years, index=default_season_index(years))
     
-    races_in_year = results[results['year'] == sel_year][['raceId', 'race_name', 'round']].drop_duplicates().sort_values('round')
+    races_in_year = get_season_races(sel_year)
     race_options = races_in_year['race_name'].tolist()
     
     sel_race_name = st.sidebar.selectbox("Select Race", race_options)
@@ -26,45 +24,47 @@ if results is not None and laps is not None:
     
     st.subheader(f"Pace Evolution: {sel_race_name} {sel_year}")
     
-    # Get Laps for this race
-    race_laps = laps[laps['raceId'] == sel_race_id].copy()
-    
-    # Merge driver names
-    if 'driver_name' not in race_laps.columns:
-        driver_map = results[['driverId', 'driver_name']].drop_duplicates()
-        race_laps = pd.merge(race_laps, driver_map, on='driverId', how='left')
+    # Laps for this race with driver names and every smoothing window precomputed
+    race_pace = get_race_pace(int(sel_race_id), sel_year)
     
     # Select Drivers to Compare
     # Default to Top 5 finishers
-    top_5_finishers = results[(results['raceId'] == sel_race_id) & (results['positionOrder'] <= 5)]['driver_name'].unique().tolist()
-    all_drivers = sorted(race_laps['driver_name'].unique().tolist())
+    race_results = get_race_results(int(sel_race_id))
+    top_5_finishers = race_results[race_results['positionOrder'] <= 5].sort_values('positionOrder')['driver_name'].unique().tolist()
+    all_drivers = sorted(race_pace['driver_name'].unique().tolist())
     
-    sel_drivers = st.multiselect("Select Drivers", all_drivers, default=top_5_finishers[:5])
+    # Races without lap timing (pre-1996) have no drivers to offer
+    sel_drivers = st.multiselect("Select Drivers", all_drivers, default=[d for d in top_5_finishers if d in all_drivers][:5])
     
     if sel_drivers:
-        viz_data = race_laps[race_laps['driver_name'].isin(sel_drivers)].copy()
-        
-        # Calculate Rolling Avg
         window = st.slider("Rolling Window (Laps)", 1, 10, 3)
-        viz_data = viz_data.sort_values(['driver_name', 'lap'])
-        viz_data['seconds'] = viz_data['milliseconds'] / 1000
-        viz_data['rolling_pace'] = viz_data.groupby('driver_name')['seconds'].transform(lambda x: x.rolling(window).mean())
+        smoothing = st.radio("Smoothing", ["Rolling average", "Exponential"], horizontal=True)
         
-        # Remove outliers (pit stops? > 100s or 110% of median??)
-        # Simple cap for visuals if median is around 90s, stops are +20s.
-        median_pace = viz_data['seconds'].median()
-        viz_data_clean = viz_data[viz_data['rolling_pace'] < median_pace * 1.3] 
+        def pace_line():
+            viz_data = race_pace[race_pace['driver_name'].isin(sel_drivers)].copy()
+            
+            # Rolling Avg (or EWM with span = window) is already a column
+            column = f"pace_{window}" if smoothing == "Rolling average" else f"ewm_{window}"
+            viz_data['rolling_pace'] = viz_data[column]
+            
+            # Remove outliers (pit stops? > 100s or 110% of median??)
+            # Simple cap for visuals if median is around 90s, stops are +20s.
+            median_pace = viz_data['seconds'].median()
+            viz_data_clean = viz_data[viz_data['rolling_pace'] < median_pace * 1.3] 
+            
+            fig_pace = px.line(
+                viz_data_clean, 
+                x='lap', 
+                y='rolling_pace', 
+                color='driver_name',
+                title=f"Race Pace Evolution ({'Rolling Avg' if smoothing == 'Rolling average' else 'EWM'} {window} Laps)",
+                labels={'rolling_pace': 'Lap Time (s)', 'lap': 'Lap Number'}
+            )
+            return format_fig(fig_pace, "Race Pace Strategy")
         
-        fig_pace = px.line(
-            viz_data_clean, 
-            x='lap', 
-            y='rolling_pace', 
-            color='driver_name',
-            title=f"Race Pace Evolution (Rolling Avg {window} Laps)",
-            labels={'rolling_pace': 'Lap Time (s)', 'lap': 'Lap Number'}
-        )
-        fig_pace = format_fig(fig_pace, "Race Pace Strategy")
-        st.plotly_chart(fig_pace, use_container_width=True)
+        fig_pace = cached_figure("lap_time_trends", "pace", {'race_id': int(sel_race_id), 'drivers': sel_drivers, 'window': window, 'smoothing': smoothing}, pace_line)
+        with stage("plotly_chart pace"):
+            st.plotly_chart(fig_pace, use_container_width=True)
     else:
         st.info("Select drivers to generate chart.")
     
@@ -118,3 +118,5 @@ if results is not None and laps is not None:
     - **Post-Pit**: Sudden pace improvement with fresh rubber
     - **Final Laps**: Either conservation (protecting position) or all-out attack
     """)
+
+end_page()
@@ -1,75 +1,100 @@
 import streamlit as st
 import plotly.express as px
-from utils import load_data, get_constructor_pit_stats, inject_custom_css, format_fig
+from utils import data_available, get_top_team_pit_summary, box_figure, get_top_overtaking_circuits, get_stints, get_degradation_ranking, cached_figure, begin_page, end_page, stage, inject_custom_css, format_fig
 
 st.set_page_config(page_title="Strategy Analytics", layout="wide")
+begin_page("Strategy Analytics")
 inject_custom_css()
 
 st.title("Strategy & Circuit Intelligence")
 
-results, _, pits = load_data()
-
-if results is not None:
-    tab1, tab2 = st.tabs(["Pit Stop Efficiency", "Circuit Overtaking"])
+if data_available():
+    tab1, tab2, tab3 = st.tabs(["Pit Stop Efficiency", "Circuit Overtaking", "Tyre Degradation"])
     
     with tab1:
         st.subheader("Team Operational Efficiency (2014-2020)")
         
-        # Get processed pit data
-        pit_stats = get_constructor_pit_stats(pits, results)
-        
-        # Filter by year for relevance
-        pit_modern = pit_stats[pit_stats['year'] >= 2014]
-        
-        # Boxplot of durations by team
-        # Data reflects Total Pit Lane Time (approx 20-25s), not just stationary time.
-        # Utils already filters < 40s.
-        pit_viz = pit_modern
+        def pit_box():
+            # Get processed pit data of the 10 busiest teams, filtered by year for relevance
+            # Boxplot of durations by team
+            # Data reflects Total Pit Lane Time (approx 20-25s), not just stationary time.
+            # Utils already filters < 40s.
+            # Quartiles and whiskers per team, computed server-side
+            summary, outliers = get_top_team_pit_summary(min_year=2014, teams=10)
+            
+            fig_pit = box_figure(
+                summary, 
+                outliers, 
+                'constructor_name', 
+                'seconds',
+                title="Pit Lane Time Distribution (Total Time)",
+                labels={'seconds': 'Total Pit Time (s)'}
+            )
+            return format_fig(fig_pit, "Pit Lane Efficiency")
         
-        top_teams = pit_viz['constructor_name'].value_counts().head(10).index
-        pit_viz_filtered = pit_viz[pit_viz['constructor_name'].isin(top_teams)]
-        
-        fig_pit = px.box(
-            pit_viz_filtered, 
-            x='constructor_name', 
-            y='seconds', 
-            color='constructor_name',
-            title="Pit Lane Time Distribution (Total Time)",
-            labels={'seconds': 'Total Pit Time (s)'}
-        )
-        fig_pit.update_layout(showlegend=False)
-        fig_pit = format_fig(fig_pit, "Pit Lane Efficiency")
-        st.plotly_chart(fig_pit, use_container_width=True)
+        fig_pit = cached_figure("strategy", "pit_box", {'min_year': 2014, 'teams': 10}, pit_box)
+        with stage("plotly_chart pit"):
+            st.plotly_chart(fig_pit, use_container_width=True)
         
     with tab2:
         st.subheader("Circuit Overtaking Potential")
         
-        # Calculate circuit stats
-        # Filter out Grid 0
-        valid_res = results[results['grid'] > 0].copy()
+        def circuit_bar():
+            # Calculate circuit stats (grid 0 excluded, established circuits only)
+            top_circuits = get_top_overtaking_circuits(min_races=10, top_n=15)
+            
+            fig_circuit = px.bar(
+                top_circuits, 
+                x='overtaking_score', 
+                y='race_name', 
+                orientation='h',
+                color='overtaking_score',
+                title="Circuit Overtaking Index (Avg Position Change)",
+                labels={'overtaking_score': 'Avg Absolute Position Change'},
+                color_continuous_scale='Reds'
+            )
+            fig_circuit.update_layout(yaxis={'categoryorder':'total ascending'})
+            return format_fig(fig_circuit, "Overtaking Factor")
         
-        circuit_stats = valid_res.groupby('race_name').agg(
-            overtaking_score=('position_gain', lambda x: x.abs().mean()),
-            races_held=('raceId', 'nunique')
-        ).reset_index()
+        fig_circuit = cached_figure("strategy", "circuit_bar", {'min_races': 10, 'top_n': 15}, circuit_bar)
+        with stage("plotly_chart circuit"):
+            st.plotly_chart(fig_circuit, use_container_width=True)
         
-        # Filter for established circuits
-        circuit_stats = circuit_stats[circuit_stats['races_held'] >= 10]
-        top_circuits = circuit_stats.sort_values('overtaking_score', ascending=False).head(15)
+    with tab3:
+        st.subheader("Tyre Degradation Ranking")
         
-        fig_circuit = px.bar(
-            top_circuits, 
-            x='overtaking_score', 
-            y='race_name', 
-            orientation='h',
-            color='overtaking_score',
-            title="Circuit Overtaking Index (Avg Position Change)",
-            labels={'overtaking_score': 'Avg Absolute Position Change'},
-            color_continuous_scale='Reds'
-        )
-        fig_circuit.update_layout(yaxis={'categoryorder':'total ascending'})
-        fig_circuit = format_fig(fig_circuit, "Overtaking Factor")
-        st.plotly_chart(fig_circuit, use_container_width=True)
+        # Stints split at pit stops, each fitted with lap time = intercept + slope * tyre age
+        stints = get_stints()
+        if stints is None or stints['degradation_s_per_lap'].notna().sum() == 0:
+            st.info("No lap times with pit stop data available.")
+        else:
+            seasons = sorted(int(y) for y in stints['year'].dropna().unique())
+            first_year, last_year = st.slider("Seasons", seasons[0], seasons[-1], (seasons[0], seasons[-1])) \
+                if len(seasons) > 1 else (seasons[0], seasons[0])
+            group = st.radio("Rank", ["Circuit", "Constructor"], horizontal=True)
+            by = 'race_name' if group == "Circuit" else 'constructor_name'
+            
+            def degradation_bar():
+                ranking = get_degradation_ranking(first_year, last_year, by)
+                fig_deg = px.bar(
+                    ranking, 
+                    x='degradation_s_per_lap', 
+                    y=by, 
+                    orientation='h',
+                    color='degradation_s_per_lap',
+                    hover_data=['stints'],
+                    title=f"Median Stint Degradation {first_year}-{last_year}",
+                    labels={'degradation_s_per_lap': 'Lap Time Loss (s/lap)', by: group},
+                    color_continuous_scale='Reds'
+                )
+                fig_deg.update_layout(yaxis={'categoryorder':'total ascending'})
+                return format_fig(fig_deg, "Tyre Degradation")
+            
+            fig_deg = cached_figure("strategy", "degradation", {'years': [first_year, last_year], 'by': by}, degradation_bar)
+            with stage("plotly_chart degradation"):
+                st.plotly_chart(fig_deg, use_container_width=True)
+            st.caption("Slopes are raw lap time trends per stint: fuel burn-off is not removed, "
+                       "so they understate tyre wear but rank races and teams consistently.")
 
 st.markdown("---")
 
@@ -142,3 +167,5 @@ We analyze team operational efficiency and circuit-specific racing characteristi
 - Total pit lane time dominated by speed limiter transit (17-20 seconds)
 - Circuit overtaking potential correlates with DRS effectiveness
 """)
+
+end_page()
@@ -0,0 +1,135 @@
+"""Every championship re-scored under other points systems at once.
+
+Each result row is a one-hot indicator of its classified finishing position,
+kept in coordinate form (row, position). Summing the indicators of a
+driver's season (np.bincount over season-driver and position) gives a dense
+(season-driver x position) count matrix, and a second one counts the
+finishes that came with the race's fastest lap. A points system is a
+vector over positions, so
+
+    totals = [counts | fastest] @ [points | bonus].T
+
+scores every season-driver under every system, with and without a fastest
+lap point, in one matrix product. Positions within each season and system
+follow the totals, then countback (most wins, then second places, ...).
+
+Every race awards full points: half-points races, double-points races,
+shared drives and the dropped-score rules of older seasons are not
+modelled, and the fastest lap point only applies where the fastest lap
+rank is recorded (2004 onwards in the source). The recorded standings
+are kept alongside as the 'Recorded' system for comparison: the official
+final standings (dropped scores and sprints applied) where the source has
+them, else the sum of the points in the results.
+"""
+import numpy as np
+import pandas as pd
+
+RECORDED = 'Recorded'
+
+# Points by classified finishing position, best first
+POINTS_SYSTEMS = {
+    '8-6-4-3-2 (1950)': (8, 6, 4, 3, 2),
+    '9-6-4-3-2-1 (1961)': (9, 6, 4, 3, 2, 1),
+    '10-6-4-3-2-1 (1991)': (10, 6, 4, 3, 2, 1),
+    '10-8-6-5-4-3-2-1 (2003)': (10, 8, 6, 5, 4, 3, 2, 1),
+    '25-18-15-12-10-8-6-4-2-1 (2010)': (25, 18, 15, 12, 10, 8, 6, 4, 2, 1),
+    'MotoGP 25-20-16-13-11-...-1': (25, 20, 16, 13, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1),
+    'Wins only': (1,),
+}
+
+# The 2019-2024 rule: one point for the fastest lap if the driver finishes in the top 10
+FASTEST_LAP_POINTS = 1
+FASTEST_LAP_TOP = 10
+
+def position_counts(results):
+    """(keys, counts, fastest) over every season-driver of results.
+
+    keys has year, driverId and driver_name per row; counts[i, p - 1] is the
+    number of classified finishes in position p and fastest[i, p - 1] those
+    of them set with the race's fastest lap (rank 1).
+    """
+    classified = results[results['position'].notna()]
+    keys = results[['year', 'driverId', 'driver_name']].drop_duplicates(['year', 'driverId'])
+    keys = keys.sort_values(['year', 'driverId']).reset_index(drop=True)
+    row_of = pd.MultiIndex.from_frame(keys[['year', 'driverId']])
+    rows = row_of.get_indexer(pd.MultiIndex.from_frame(classified[['year', 'driverId']]))
+
+    n_positions = int(classified['position'].max()) if len(classified) else 1
+    cells = rows * n_positions + classified['position'].to_numpy(dtype='int64') - 1
+    size = len(keys) * n_positions
+    counts = np.bincount(cells, minlength=size).reshape(len(keys), n_positions)
+    fastest_lap = (classified['rank'] == 1).fillna(False).to_numpy(dtype=bool)
+    fastest = np.bincount(cells[fastest_lap], minlength=size).reshape(len(keys), n_positions)
+    return keys, counts, fastest
+
+def weight_matrix(systems, n_positions, fastest_lap_points=FASTEST_LAP_POINTS, fastest_lap_top=FASTEST_LAP_TOP):
+    """(points, bonus): one row per system over positions 1..n_positions, the
+    second giving the fastest lap points each position is eligible for."""
+    points = np.zeros((len(systems), n_positions))
+    for i, vector in enumerate(systems):
+        vector = vector[:n_positions]
+        points[i, :len(vector)] = vector
+    bonus = np.zeros_like(points)
+    bonus[:, :fastest_lap_top] = fastest_lap_points
+    return points, bonus
+
+def rescore(results, systems=POINTS_SYSTEMS, standings=None):
+    """Season standings under every system, with and without the fastest lap point.
+
+    Long frame: system, fastest_lap, year, driverId, driver_name, points,
+    position. The RECORDED system (fastest_lap False) takes the final points
+    and positions of standings (the official driver standings after each
+    round) for the seasons it covers and sums the points in results otherwise.
+    """
+    keys, counts, fastest = position_counts(results)
+    names = list(systems)
+    points, bonus = weight_matrix(list(systems.values()), counts.shape[1])
+
+    # One product for every system and variant: no bonus, then with the bonus
+    weights = np.vstack([np.hstack([points, np.zeros_like(bonus)]), np.hstack([points, bonus])])
+    totals = np.hstack([counts, fastest]) @ weights.T
+
+    recorded = results.groupby(['year', 'driverId'], observed=True)['points'].sum()
+    index = pd.MultiIndex.from_frame(keys[['year', 'driverId']])
+    recorded = recorded.reindex(index).fillna(0).to_numpy(dtype='float64')
+    official = np.full(len(keys), np.nan)
+    if standings is not None:
+        # Each driver's last row of the season is their final standing
+        final = standings.sort_values(['year', 'round'], kind='stable').groupby(['year', 'driverId'], observed=True).last()
+        final = final.reindex(index)
+        covered = keys['year'].isin(standings['year'].unique()).to_numpy()
+        recorded = np.where(covered, final['points'].fillna(0).to_numpy(dtype='float64'), recorded)
+        official = final['position'].to_numpy(dtype='float64', na_value=np.nan)
+    totals = np.column_stack([totals, recorded])
+    labels = names + names + [RECORDED]
+    flags = [False] * len(names) + [True] * len(names) + [False]
+
+    # Countback: rank of each season-driver by wins, then seconds, ...
+    countback = np.empty(len(keys), dtype='int64')
+    countback[np.lexsort([-counts[:, p] for p in reversed(range(counts.shape[1]))])] = np.arange(len(keys))
+
+    n_keys, n_systems = totals.shape
+    table = pd.DataFrame({
+        'system': np.repeat(labels, n_keys),
+        'fastest_lap': np.repeat(flags, n_keys),
+        'year': np.tile(keys['year'].to_numpy(), n_systems),
+        'driverId': np.tile(keys['driverId'].to_numpy(), n_systems),
+        'driver_name': np.tile(keys['driver_name'].astype(str).to_numpy(), n_systems),
+        'points': totals.T.ravel(),
+        '_countback': np.tile(countback, n_systems),
+        # Official positions order the RECORDED system ahead of its points
+        '_official': np.r_[np.full(n_keys * (n_systems - 1), np.nan), official],
+    })
+    table = table.sort_values(['system', 'fastest_lap', 'year', '_official', 'points', '_countback'],
+                              ascending=[True, True, True, True, False, True], na_position='last', kind='stable')
+    table['position'] = table.groupby(['system', 'fastest_lap', 'year']).cumcount() + 1
+    return table.drop(columns=['_countback', '_official']).reset_index(drop=True)
+
+def champions(table):
+    """Champion per season and system: year, system, fastest_lap, driverId,
+    driver_name, points and whether they differ from the RECORDED (official)
+    champion."""
+    winners = table[table['position'] == 1].drop(columns='position')
+    recorded = winners[winners['system'] == RECORDED].set_index('year')['driverId']
+    winners = winners.assign(changed=winners['driverId'].to_numpy() != recorded.reindex(winners['year']).to_numpy())
+    return winners.reset_index(drop=True)
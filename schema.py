@@ -0,0 +1,176 @@
+"""Typed schema for the clean tables, shared by data_prep and the dashboard.
+
+The clean CSVs load as int64/float64/object by default, which repeats every
+driver and race name as a Python string on each lap row. Applying these dtypes
+keeps ids in narrow integers, string dimensions as categoricals, dates as
+datetime64 and nullable columns as pandas nullable ints.
+"""
+import pandas as pd
+
+RACE_COLUMNS = {
+    'raceId': 'int32',
+    'year': 'int16',
+    'round': 'int8',
+    'circuitId': 'int16',
+    'race_name': 'category',
+    'race_date': 'datetime64[ns]',
+}
+
+DRIVER_COLUMNS = {
+    'driverId': 'int32',
+    'driver_name': 'category',
+    'driver_nationality': 'category',
+    'code': 'category',
+}
+
+CONSTRUCTOR_COLUMNS = {
+    'constructorId': 'int32',
+    'constructor_name': 'category',
+    'constructor_nationality': 'category',
+}
+
+# Dimension tables of the star layout (data_prep.py --layout star):
+# name -> (key, attribute columns)
+DIMENSIONS = {
+    'races': ('raceId', [c for c in RACE_COLUMNS if c != 'raceId']),
+    'drivers': ('driverId', [c for c in DRIVER_COLUMNS if c != 'driverId']),
+    'constructors': ('constructorId', [c for c in CONSTRUCTOR_COLUMNS if c != 'constructorId']),
+}
+
+# Fact tables that are written narrow (ids, year and measures only) in the star layout
+STAR_TABLES = ['lap_times', 'pit_stops']
+
+SCHEMA = {
+    'races': RACE_COLUMNS,
+    'drivers': DRIVER_COLUMNS,
+    'constructors': CONSTRUCTOR_COLUMNS,
+    'results': {
+        'resultId': 'int32',
+        **RACE_COLUMNS,
+        **DRIVER_COLUMNS,
+        **CONSTRUCTOR_COLUMNS,
+        'number': 'Int16',
+        'grid': 'int8',
+        'position': 'Int8',
+        'positionText': 'category',
+        'positionOrder': 'int8',
+        'points': 'float32',
+        'laps': 'int16',
+        'milliseconds': 'Int32',
+        'fastestLap': 'Int16',
+        'rank': 'Int8',
+        'fastestLapSpeed': 'float32',
+        'statusId': 'int16',
+        # Derived at ingest (features.py)
+        'position_gain': 'int8',
+        'is_win': 'int8',
+        'is_podium': 'int8',
+        'is_dnf': 'int8',
+        'status': 'category',
+        'status_category': 'category',
+    },
+    'lap_times': {
+        **RACE_COLUMNS,
+        **DRIVER_COLUMNS,
+        'lap': 'int16',
+        'position': 'Int8',
+        'milliseconds': 'int32',
+    },
+    'pit_stops': {
+        **RACE_COLUMNS,
+        **DRIVER_COLUMNS,
+        'stop': 'int8',
+        'lap': 'int16',
+        'milliseconds': 'int32',
+    },
+    # Official championship standings after each race (points include sprints
+    # and apply the dropped-score rules of the season)
+    'driver_standings': {
+        **RACE_COLUMNS,
+        **DRIVER_COLUMNS,
+        'points': 'float32',
+        'position': 'Int16',
+        'positionText': 'category',
+        'wins': 'int8',
+    },
+    # Fitted stints (stints.py), one row per driver-race stint
+    'stints': {
+        'raceId': 'int32',
+        'driverId': 'int32',
+        'stint': 'int8',
+        'start_lap': 'int16',
+        'end_lap': 'int16',
+        'laps': 'int16',
+        'fit_laps': 'int16',
+        'intercept_s': 'float64',
+        'degradation_s_per_lap': 'float64',
+        'rmse_s': 'float64',
+        'year': 'int16',
+        'race_name': 'category',
+        'driver_name': 'category',
+        'constructor_name': 'category',
+    },
+}
+
+def category_columns(table):
+    """Columns of a table that should be parsed straight into categoricals."""
+    return [col for col, dtype in SCHEMA[table].items() if dtype == 'category']
+
+def apply_schema(df, table):
+    """Cast the columns of df that appear in SCHEMA[table]; others are left as-is.
+
+    Integer columns that contain missing values are promoted to the matching
+    nullable dtype (int8 -> Int8) instead of failing.
+    """
+    for col, dtype in SCHEMA[table].items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        series = df[col]
+
+        if dtype == 'category':
+            df[col] = series.astype('category')
+        elif dtype.startswith('datetime'):
+            df[col] = pd.to_datetime(series, errors='coerce')
+        else:
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # e.g. hive partition keys read back from Parquet
+                series = series.astype(series.cat.categories.dtype)
+            elif series.dtype == object or pd.api.types.is_string_dtype(series):
+                series = pd.to_numeric(series, errors='coerce')
+            if dtype.startswith('int') and series.isna().any():
+                dtype = dtype.capitalize()
+            df[col] = series.astype(dtype)
+    return df
+
+def footprint(df):
+    """Deep in-memory size of a DataFrame in bytes."""
+    return int(df.memory_usage(deep=True).sum())
+
+def memory_report(before, after):
+    """Print and return the per-table footprint before and after typing.
+
+    `before` and `after` map table name -> size in bytes (see footprint).
+    """
+    rows = []
+    for name, before_bytes in before.items():
+        after_bytes = after[name]
+        rows.append({
+            'table': name,
+            'before_mb': round(before_bytes / 1e6, 2),
+            'after_mb': round(after_bytes / 1e6, 2),
+            'saved_pct': round(100 * (1 - after_bytes / before_bytes), 1) if before_bytes else 0.0
+        })
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False))
+    return report
+
+if __name__ == "__main__":
+    import os
+    from utils import read_table
+
+    before, after = {}, {}
+    for name in ['results', 'lap_times', 'pit_stops']:
+        if os.path.exists(f"data/clean_{name}.csv"):
+            before[name] = footprint(pd.read_csv(f"data/clean_{name}.csv"))
+            after[name] = footprint(read_table(name))
+    memory_report(before, after)
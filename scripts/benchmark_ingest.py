@@ -0,0 +1,157 @@
+"""Ingest benchmark: time and memory-profile each data_prep stage at growing history sizes.
+
+For every scale a synthetic source dataset is generated (or reused) with
+synthetic_data.py, then load_data, clean_data, merge_data and export_data
+run on it in a scratch directory. Each stage records wall time, the peak of
+memory allocated during the stage (tracemalloc) and the process peak RSS.
+
+Results go to benchmarks/ingest_<timestamp>.json, and the table printed at
+the end compares them with the previous result file.
+
+Usage:
+    python scripts/benchmark_ingest.py --scales 1 10 --format parquet
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import platform
+import resource
+import tracemalloc
+from contextlib import contextmanager
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import data_prep
+from synthetic_data import generate_dataset
+
+RESULTS_DIR = "benchmarks"
+SYNTHETIC_DIR = os.path.join("data", "synthetic")
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+@contextmanager
+def measure(stage, records, trace_memory=True):
+    """Append {stage, seconds, peak_alloc_mb, peak_rss_mb} to records."""
+    if trace_memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    yield
+    record = {'stage': stage, 'seconds': round(time.perf_counter() - start, 3)}
+    if trace_memory:
+        record['peak_alloc_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+    record['peak_rss_mb'] = round(_peak_rss_mb(), 1)
+    records.append(record)
+    print(f"  {stage:<8}{record['seconds']:8.2f}s  "
+          f"{record.get('peak_alloc_mb', float('nan')):9.1f} MB alloc  {record['peak_rss_mb']:9.1f} MB rss")
+
+def source_dir(scale, seed=0):
+    """Synthetic source tables for scale, generated on first use."""
+    path = os.path.join(SYNTHETIC_DIR, f"x{scale}")
+    if not os.path.exists(os.path.join(path, "lap_times.csv")):
+        generate_dataset(path, scale=scale, seed=seed)
+    return path
+
+def bench_scale(scale, fmt='csv', layout='denormalized', workers=data_prep.DEFAULT_WORKERS,
+                pool='thread', trace_memory=True):
+    """Run the ingest stages on one synthetic dataset; returns the stage records."""
+    src = os.path.abspath(source_dir(scale))
+    out_dir = os.path.abspath(os.path.join(SYNTHETIC_DIR, f"x{scale}_out"))
+    os.makedirs(os.path.join(out_dir, "data"), exist_ok=True)
+    source_mb = sum(os.path.getsize(p) for p in glob.glob(os.path.join(src, "*.csv"))) / 1e6
+    print(f"\n=== x{scale} ({source_mb:,.0f} MB of source CSV) ===")
+
+    records = []
+    cwd = os.getcwd()
+    # data_prep writes to ./data, so export into the scratch directory
+    os.chdir(out_dir)
+    try:
+        if trace_memory:
+            tracemalloc.start()
+        with measure("load", records, trace_memory):
+            data = data_prep.load_data(src, workers=workers, pool=pool)
+        rows = {name: len(df) for name, df in data.items()}
+        with measure("clean", records, trace_memory):
+            data = data_prep.clean_data(data)
+        with measure("merge", records, trace_memory):
+            merged = data_prep.merge_data(data, layout=layout)
+        del data
+        with measure("export", records, trace_memory):
+            data_prep.export_data(merged, fmt=fmt, workers=workers, pool=pool)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        os.chdir(cwd)
+
+    return {'scale': scale, 'source_mb': round(source_mb, 1), 'rows': rows, 'stages': records}
+
+def previous_results(exclude=None):
+    """The most recent earlier result file, or None."""
+    paths = sorted(p for p in glob.glob(os.path.join(RESULTS_DIR, "ingest_*.json")) if p != exclude)
+    if not paths:
+        return None
+    with open(paths[-1]) as f:
+        return json.load(f)
+
+def compare(current, previous):
+    """Print each stage's seconds and allocation peak next to the previous run."""
+    before = {}
+    if previous is not None:
+        for run in previous['runs']:
+            for record in run['stages']:
+                before[(run['scale'], record['stage'])] = record
+
+    print("\n--- Ingest Benchmark ---")
+    print(f"{'scale':>6} {'stage':<8}{'seconds':>10}{'prev':>10}{'alloc MB':>12}{'prev':>10}")
+    for run in current['runs']:
+        for record in run['stages']:
+            prev = before.get((run['scale'], record['stage']), {})
+            print(f"{'x' + str(run['scale']):>6} {record['stage']:<8}"
+                  f"{record['seconds']:>10.2f}{prev.get('seconds', float('nan')):>10.2f}"
+                  f"{record.get('peak_alloc_mb', float('nan')):>12.1f}"
+                  f"{prev.get('peak_alloc_mb', float('nan')):>10.1f}")
+
+def run_benchmark(scales=(1, 10), fmt='csv', layout='denormalized', workers=data_prep.DEFAULT_WORKERS,
+                  pool='thread', trace_memory=True, output=None):
+    result = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'format': fmt,
+        'layout': layout,
+        'workers': workers,
+        'pool': pool,
+        'trace_memory': trace_memory,
+        'runs': [bench_scale(scale, fmt, layout, workers, pool, trace_memory) for scale in scales],
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = output or os.path.join(RESULTS_DIR, f"ingest_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    compare(result, previous_results(exclude=output))
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {output}")
+    return result
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the data_prep ingest stages")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10],
+                        help="History size multiples to run (e.g. 1 10 100)")
+    parser.add_argument("--format", dest="fmt", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--layout", choices=data_prep.LAYOUTS, default="denormalized")
+    parser.add_argument("--workers", type=int, default=data_prep.DEFAULT_WORKERS)
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false",
+                        help="Skip tracemalloc (it slows the stages down) and report timings and RSS only")
+    parser.add_argument("--output", default=None, help="Result file (default benchmarks/ingest_<timestamp>.json)")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_benchmark(scales=args.scales, fmt=args.fmt, layout=args.layout, workers=args.workers,
+                  pool=args.pool, trace_memory=args.trace_memory, output=args.output)
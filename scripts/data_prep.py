@@ -1,13 +1,94 @@
 import kagglehub
 import pandas as pd
 import os
+import shutil
+import argparse
+import json
+import hashlib
+import sys
+import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-def load_data():
+# Make the repo root importable for the shared schema
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema import apply_schema
+from lap_store import build_lap_store, COLUMNS as LAP_STORE_COLUMNS
+from sql_backend import build_database, database_exists
+from arrow_store import write_arrow
+from features import add_result_features
+from aggregates import build_aggregates, write_aggregates, read_aggregate
+from stints import stint_table
+
+DATA_DIR = "data"
+MANIFEST_PATH = os.path.join(DATA_DIR, "ingest_manifest.json")
+# Row counts and coverage read by the dashboard landing page
+SUMMARY_PATH = os.path.join(DATA_DIR, "table_summary.json")
+
+# Source tables whose rows belong to a single race; a change in any of them
+# only invalidates that race's rows in the clean outputs
+RACE_TABLES = ['races', 'results', 'lap_times', 'pit_stops', 'driver_standings']
+# Dimension tables are denormalized onto every row, so a change forces a full rebuild
+DIMENSION_TABLES = ['drivers', 'constructors', 'status']
+
+# lap_times rows read per chunk by the streaming ingest (--stream-laps)
+LAP_CHUNKSIZE = 500_000
+
+# Worker pool used for the independent per-table reads and writes
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Seconds spent per stage/table during this run, printed by print_timings
+STAGE_TIMINGS = {}
+
+# Output file stem for each merged master table
+EXPORT_NAMES = {
+    'results_master': 'clean_results',
+    'lap_times_master': 'clean_lap_times',
+    'pit_stops_master': 'clean_pit_stops',
+    # Official standings after each race; only when the source has driver_standings.csv
+    'driver_standings_master': 'clean_driver_standings',
+    # Star layout only: small dimension tables the narrow facts join against
+    'races_dim': 'dim_races',
+    'drivers_dim': 'dim_drivers',
+    'constructors_dim': 'dim_constructors'
+}
+
+# denormalized: names copied onto every lap/pit row (default)
+# star: lap/pit facts keep ids only, names live in the dim_* tables
+LAYOUTS = ['denormalized', 'star']
+
+def table_for(stem):
+    """Schema table name for an output stem (clean_lap_times -> lap_times, dim_races -> races)."""
+    return stem.split('_', 1)[1]
+
+def get_source_path():
     print("Downloading dataset...")
     # This will use the cached path if already downloaded
     path = kagglehub.dataset_download("rohanrao/formula-1-world-championship-1950-2020")
     print(f"Path to dataset files: {path}")
+    return path
+
+def make_pool(workers, pool='thread'):
+    """Threads share the frames without copying; processes sidestep the GIL
+    at the cost of pickling each frame across the process boundary."""
+    executor = ProcessPoolExecutor if pool == 'process' else ThreadPoolExecutor
+    return executor(max_workers=workers)
+
+def print_timings():
+    print("\n--- Stage Timings ---")
+    for stage, seconds in STAGE_TIMINGS.items():
+        print(f"{stage:<34}{seconds:8.2f}s")
+
+def _read_source(file_path):
+    start = time.perf_counter()
+    # Handle \N as NaN explicitly for all files
+    df = pd.read_csv(file_path, na_values=['\\N'])
+    return df, time.perf_counter() - start
+
+def load_data(path=None, exclude=(), workers=DEFAULT_WORKERS, pool='thread'):
+    """Load the key source tables concurrently; names in `exclude` are skipped (e.g. streamed later)."""
+    if path is None:
+        path = get_source_path()
 
     files = [f for f in os.listdir(path) if f.endswith('.csv')]
     
@@ -21,18 +102,29 @@ def load_data():
         'lap_times': 'lap_times.csv', 
         'pit_stops': 'pit_stops.csv', 
         'qualifying': 'qualifying.csv', 
-        'driver_standings': 'driver_standings.csv'
+        'driver_standings': 'driver_standings.csv',
+        'status': 'status.csv'
     }
 
+    to_load = {}
     for name, filename in key_files.items():
+        if name in exclude:
+            continue
         if filename in files:
-            file_path = os.path.join(path, filename)
-            # Handle \N as NaN explicitly for all files
-            df = pd.read_csv(file_path, na_values=['\\N']) 
-            data[name] = df
-            print(f"Loaded {name}: {df.shape}")
+            to_load[name] = os.path.join(path, filename)
         else:
             print(f"WARNING: {filename} not found!")
+
+    # Tables are independent, so wall time is bounded by the largest one
+    start = time.perf_counter()
+    with make_pool(workers, pool) as executor:
+        futures = {name: executor.submit(_read_source, file_path) for name, file_path in to_load.items()}
+        for name, future in futures.items():
+            df, seconds = future.result()
+            data[name] = df
+            STAGE_TIMINGS[f"load {name}"] = seconds
+            print(f"Loaded {name}: {df.shape}")
+    STAGE_TIMINGS["load (wall)"] = time.perf_counter() - start
     
     return data
 
@@ -91,11 +183,7 @@ def clean_data(data):
 
     # 5. Clean Lap Times
     if 'lap_times' in data:
-        df = data['lap_times']
-        df['milliseconds'] = pd.to_numeric(df['milliseconds'], errors='coerce')
-        # Sanity check: lap time > 0
-        df = df[df['milliseconds'] > 0]
-        data['lap_times'] = df
+        data['lap_times'] = clean_lap_times(data['lap_times'])
         print("Cleaned lap_times")
 
     # 6. Clean Pit Stops
@@ -105,27 +193,74 @@ def clean_data(data):
         df = df[df['milliseconds'] > 0]
         data['pit_stops'] = df
         print("Cleaned pit_stops")
+
+    # 7. Clean Driver Standings
+    if 'driver_standings' in data:
+        df = data['driver_standings']
+        for col in ['points', 'position', 'wins']:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        data['driver_standings'] = df.drop(columns=['driverStandingsId'], errors='ignore')
+        print("Cleaned driver_standings")
         
     return data
 
-def merge_data(data):
+def clean_lap_times(df):
+    df['milliseconds'] = pd.to_numeric(df['milliseconds'], errors='coerce')
+    # Sanity check: lap time > 0
+    return df[df['milliseconds'] > 0]
+
+def dimension_tables(data):
+    """Slim races/drivers/constructors frames used to enrich the fact tables.
+
+    Name columns are categoricals built over the whole dimension, so every
+    merged frame (and every streamed lap chunk) shares identical categories.
+    """
+    races = data['races'][['raceId', 'year', 'round', 'circuitId', 'name', 'date']]
+    races = races.rename(columns={'name': 'race_name', 'date': 'race_date'})
+    races['race_name'] = races['race_name'].astype('category')
+
+    drivers = data['drivers'][['driverId', 'driver_name', 'nationality', 'code']]
+    drivers = drivers.rename(columns={'nationality': 'driver_nationality'})
+    for col in ['driver_name', 'driver_nationality', 'code']:
+        drivers[col] = drivers[col].astype('category')
+
+    constructors = data['constructors'][['constructorId', 'name', 'nationality']]
+    constructors = constructors.rename(columns={'name': 'constructor_name', 'nationality': 'constructor_nationality'})
+    for col in ['constructor_name', 'constructor_nationality']:
+        constructors[col] = constructors[col].astype('category')
+
+    return races, drivers, constructors
+
+def to_fact(df, races):
+    """Narrow star-layout fact: the source columns plus year for partitioning."""
+    return df.assign(year=df['raceId'].map(races.set_index('raceId')['year']))
+
+def enrich_laps(laps, races, drivers, layout='denormalized'):
+    if layout == 'star':
+        return to_fact(laps, races)
+    laps_master = pd.merge(laps, races, on='raceId', how='left')
+    return pd.merge(laps_master, drivers, on='driverId', how='left')
+
+def merge_data(data, include_laps=True, layout='denormalized'):
+    """Build the output tables; include_laps=False leaves lap_times to stream_lap_times.
+
+    With layout='star' the lap and pit tables stay narrow and the race, driver
+    and constructor dimensions are returned as separate tables instead.
+    Results stay denormalized in both layouts; they are small and every page
+    reads their names.
+    """
     print("\n--- Starting Data Merging ---")
     
     # Prerequisite check
-    required = ['results', 'races', 'drivers', 'constructors', 'lap_times', 'pit_stops']
+    required = ['results', 'races', 'drivers', 'constructors', 'pit_stops']
+    if include_laps:
+        required.append('lap_times')
     for req in required:
         if req not in data:
             print(f"CRITICAL: Missing {req} table for merging.")
             return {}
 
-    races = data['races'][['raceId', 'year', 'round', 'circuitId', 'name', 'date']]
-    races = races.rename(columns={'name': 'race_name', 'date': 'race_date'})
-    
-    drivers = data['drivers'][['driverId', 'driver_name', 'nationality', 'code']]
-    drivers = drivers.rename(columns={'nationality': 'driver_nationality'})
-    
-    constructors = data['constructors'][['constructorId', 'name', 'nationality']]
-    constructors = constructors.rename(columns={'name': 'constructor_name', 'nationality': 'constructor_nationality'})
+    races, drivers, constructors = dimension_tables(data)
 
     # 1. Race Results Master
     print("Merging Results Master...")
@@ -139,56 +274,572 @@ def merge_data(data):
     
     # Merge with Constructors
     res_master = pd.merge(res_master, constructors, on='constructorId', how='left')
+
+    # Derived result features (position_gain, win/podium/DNF flags, status category)
+    start = time.perf_counter()
+    res_master = add_result_features(res_master, data.get('status'))
+    STAGE_TIMINGS["features"] = time.perf_counter() - start
     
     # 2. Lap Times Master
-    print("Merging Lap Times Master...")
-    laps = data['lap_times']
-    
-    # Merge with Races
-    laps_master = pd.merge(laps, races, on='raceId', how='left')
-    
-    # Merge with Drivers
-    laps_master = pd.merge(laps_master, drivers, on='driverId', how='left')
+    laps_master = None
+    if include_laps:
+        print("Merging Lap Times Master...")
+        laps_master = enrich_laps(data['lap_times'], races, drivers, layout)
     
     # 3. Pit Stops Master
     print("Merging Pit Stops Master...")
     pits = data['pit_stops']
+    if layout == 'star':
+        pits_master = to_fact(pits, races)
+    else:
+        # Merge with Races
+        pits_master = pd.merge(pits, races, on='raceId', how='left')
+
+        # Merge with Drivers
+        pits_master = pd.merge(pits_master, drivers, on='driverId', how='left')
     
-    # Merge with Races
-    pits_master = pd.merge(pits, races, on='raceId', how='left')
-    
-    # Merge with Drivers
-    pits_master = pd.merge(pits_master, drivers, on='driverId', how='left')
+    # 4. Driver Standings Master (small, denormalized in both layouts like results)
+    standings_master = None
+    if 'driver_standings' in data:
+        print("Merging Driver Standings Master...")
+        standings_master = pd.merge(data['driver_standings'], races, on='raceId', how='left')
+        standings_master = pd.merge(standings_master, drivers, on='driverId', how='left')
     
-    return {
+    merged = {
         'results_master': res_master,
         'lap_times_master': laps_master,
-        'pit_stops_master': pits_master
+        'pit_stops_master': pits_master,
+        'driver_standings_master': standings_master
     }
+    if layout == 'star':
+        merged.update({'races_dim': races, 'drivers_dim': drivers, 'constructors_dim': constructors})
+    return {name: df for name, df in merged.items() if df is not None}
+
+def write_partitioned(df, out_dir, partition_col='year', part_name="part-0.parquet"):
+    """Write df as one Parquet file per partition value (hive layout).
+
+    Files are named deterministically (out_dir/year=2021/part-0.parquet) so a
+    single partition can be replaced later without touching the others.
+    The streaming lap ingest passes part_name to add one file per chunk.
+    """
+    for value, part in df.groupby(partition_col, sort=True, observed=True):
+        part_dir = os.path.join(out_dir, f"{partition_col}={value}")
+        os.makedirs(part_dir, exist_ok=True)
+        part.drop(columns=[partition_col]).to_parquet(
+            os.path.join(part_dir, part_name), index=False
+        )
+
+def stream_lap_times(path, data, fmt='csv', chunksize=LAP_CHUNKSIZE, layout='denormalized'):
+    """Clean, enrich and export lap_times.csv one chunk at a time.
+
+    Only one chunk plus the small dimension tables is ever held in memory, so
+    peak usage does not grow with lap history. `data` must already be cleaned
+    (drivers need driver_name). Returns per-race fingerprints of the raw rows
+    for the ingest manifest.
+    """
+    print("\n--- Streaming Lap Times ---")
+    races, drivers, _ = dimension_tables(data)
+    stem = EXPORT_NAMES['lap_times_master']
+    out_dir = os.path.join(DATA_DIR, stem)
+    csv_path = os.path.join(DATA_DIR, f"{stem}.csv")
+    if fmt == 'parquet' and os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
 
-def export_data(merged_data):
+    race_hashes = []
+    total = 0
+    reader = pd.read_csv(os.path.join(path, 'lap_times.csv'), na_values=['\\N'], chunksize=chunksize)
+    for i, chunk in enumerate(reader):
+        race_hashes.append(_hash_by_race(chunk))
+        chunk = apply_schema(enrich_laps(clean_lap_times(chunk), races, drivers, layout), 'lap_times')
+
+        if fmt == 'parquet':
+            write_partitioned(chunk, out_dir, part_name=f"part-{i}.parquet")
+        else:
+            chunk.to_csv(csv_path, index=False, mode='w' if i == 0 else 'a', header=(i == 0))
+        total += len(chunk)
+        print(f"Chunk {i}: {total:,} lap rows written")
+
+    # Fold the per-chunk fingerprints into one running value per race
+    return _xor_combine(race_hashes)
+
+def dimension_path(stem, fmt):
+    return os.path.join(DATA_DIR, f"{stem}.{'parquet' if fmt == 'parquet' else 'csv'}")
+
+def remove_dimension_files():
+    for name, stem in EXPORT_NAMES.items():
+        if name.endswith('_dim'):
+            for fmt in ['parquet', 'csv']:
+                if os.path.exists(dimension_path(stem, fmt)):
+                    os.remove(dimension_path(stem, fmt))
+
+def _export_table(df, stem, fmt):
+    """Type and write one table; returns the seconds it took."""
+    start = time.perf_counter()
+    df = apply_schema(df, table_for(stem))
+
+    if stem.startswith('dim_'):
+        # Dimensions are small enough to stay a single file
+        print(f"Saving {os.path.basename(dimension_path(stem, fmt))} (Shape: {df.shape})...")
+        _replace_file(df, dimension_path(stem, fmt), fmt)
+    elif fmt == 'parquet':
+        out_dir = os.path.join(DATA_DIR, stem)
+        print(f"Saving {stem}/ partitioned by year (Shape: {df.shape})...")
+        # Start from an empty directory so stale seasons never linger
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+        write_partitioned(df, out_dir)
+    else:
+        print(f"Saving {stem}.csv (Shape: {df.shape})...")
+        df.to_csv(os.path.join(DATA_DIR, f"{stem}.csv"), index=False)
+    return time.perf_counter() - start
+
+def export_data(merged_data, fmt='csv', workers=DEFAULT_WORKERS, pool='thread'):
+    """Export the merged masters concurrently, as CSV or as year-partitioned Parquet.
+
+    Tables are cast to the shared schema first, so the Parquet files keep the
+    compact dtypes the dashboard loads.
+    """
     print("\n--- Exporting Data ---")
+    if not any(name.endswith('_dim') for name in merged_data):
+        # Denormalized export: drop dimensions left behind by an earlier star export
+        remove_dimension_files()
+    start = time.perf_counter()
+    with make_pool(workers, pool) as executor:
+        futures = {EXPORT_NAMES[name]: executor.submit(_export_table, df, EXPORT_NAMES[name], fmt)
+                   for name, df in merged_data.items()}
+        for stem, future in futures.items():
+            STAGE_TIMINGS[f"export {stem}"] = future.result()
+    STAGE_TIMINGS["export (wall)"] = time.perf_counter() - start
+    print("Saved.")
+
+def _row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def _hash_by_race(df):
+    """Order-independent fingerprint of each raceId's rows (XOR of row hashes)."""
+    if df.empty:
+        return pd.Series(dtype='uint64')
+    hashes = _row_hashes(df)
+    race_ids = df['raceId'].to_numpy()
+    order = np.argsort(race_ids, kind='stable')
+    race_ids, hashes = race_ids[order], hashes[order]
+    starts = np.flatnonzero(np.r_[True, race_ids[1:] != race_ids[:-1]])
+    return pd.Series(np.bitwise_xor.reduceat(hashes, starts), index=race_ids[starts])
+
+def _xor_combine(series_list):
+    """XOR per-race fingerprints together, aligning on raceId."""
+    series_list = [s for s in series_list if not s.empty]
+    if not series_list:
+        return pd.Series(dtype='uint64')
+    all_races = pd.Index(sorted(set().union(*(s.index for s in series_list))))
+    combined = np.zeros(len(all_races), dtype='uint64')
+    for s in series_list:
+        # reindex with fill_value keeps uint64 (NaN alignment would round to float)
+        combined ^= s.reindex(all_races, fill_value=0).to_numpy(dtype='uint64')
+    return pd.Series(combined, index=all_races)
+
+def build_manifest(data, fmt, layout='denormalized'):
+    """Fingerprint the raw source tables so the next run can detect changed races.
+
+    Must be called on the freshly loaded tables, before clean_data mutates them.
+    A race's fingerprint is the XOR of its row hashes across RACE_TABLES, so a
+    table streamed later can be folded in with extend_manifest.
+    """
+    race_hashes = _xor_combine([_hash_by_race(data[name]) for name in RACE_TABLES if name in data])
+    race_years = data['races'].set_index('raceId')['year'] if 'races' in data else pd.Series(dtype=int)
+
+    dimensions = {}
+    for name in DIMENSION_TABLES:
+        if name in data:
+            dimensions[name] = str(np.bitwise_xor.reduce(_row_hashes(data[name])))
+
+    return {
+        'format': fmt,
+        'layout': layout,
+        'dimensions': dimensions,
+        'races': {
+            str(race_id): {'year': int(race_years.get(race_id, -1)), 'hash': str(h)}
+            for race_id, h in race_hashes.items()
+        }
+    }
+
+def extend_manifest(manifest, race_hashes):
+    """Fold fingerprints of a separately streamed table into a manifest."""
+    for race_id, h in race_hashes.items():
+        entry = manifest['races'].setdefault(str(race_id), {'year': -1, 'hash': '0'})
+        entry['hash'] = str(int(entry['hash']) ^ int(h))
+    return manifest
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return None
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+def save_manifest(manifest):
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f)
+
+def diff_manifests(old, new):
+    """Return (changed_or_new_race_ids, removed_race_ids, affected_years)."""
+    old_races, new_races = old['races'], new['races']
+    changed = {int(r) for r, entry in new_races.items()
+               if r not in old_races or old_races[r]['hash'] != entry['hash']}
+    removed = {int(r) for r in old_races if r not in new_races}
+
+    years = set()
+    for race_id in changed | removed:
+        for races in (old_races, new_races):
+            entry = races.get(str(race_id))
+            if entry is not None and entry['year'] >= 0:
+                years.add(entry['year'])
+    return changed, removed, years
+
+def filter_races(data, race_ids):
+    """Keep only the rows of race_ids in the per-race tables; dimensions stay whole."""
+    subset = {}
+    for name, df in data.items():
+        if 'raceId' in df.columns:
+            subset[name] = df[df['raceId'].isin(race_ids)].copy()
+        else:
+            subset[name] = df
+    return subset
+
+def export_exists(stem, fmt):
+    if fmt == 'parquet':
+        return os.path.isdir(os.path.join(DATA_DIR, stem))
+    return os.path.exists(os.path.join(DATA_DIR, f"{stem}.csv"))
+
+def remove_export(stem):
+    """Delete a fact export in either format (e.g. standings the source no longer has)."""
+    shutil.rmtree(os.path.join(DATA_DIR, stem), ignore_errors=True)
+    if os.path.exists(os.path.join(DATA_DIR, f"{stem}.csv")):
+        os.remove(os.path.join(DATA_DIR, f"{stem}.csv"))
+
+def exports_exist(fmt, layout='denormalized'):
+    """True when the exports an incremental run updates are on disk
+    (the optional standings export is checked by run_pipeline)."""
+    for name, stem in EXPORT_NAMES.items():
+        if name == 'driver_standings_master':
+            continue
+        if name.endswith('_dim'):
+            if layout == 'star' and not os.path.exists(dimension_path(stem, fmt)):
+                return False
+        elif not export_exists(stem, fmt):
+            return False
+    return True
+
+def _replace_file(df, path, fmt):
+    # Write next to the target and swap in, so readers never see a partial file.
+    # The dot prefix keeps Parquet dataset readers from picking up the temp file.
+    tmp_path = os.path.join(os.path.dirname(path), "." + os.path.basename(path) + ".tmp")
+    if fmt == 'parquet':
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def update_exports(merged_data, race_ids, years, fmt='csv'):
+    """Replace the rows of race_ids in the existing exports with freshly merged ones.
+
+    For Parquet only the partitions in `years` are rewritten; the CSV export has
+    no partitions, so its file is rewritten with the affected races swapped out.
+    """
+    print("\n--- Updating Exports ---")
     for name, df in merged_data.items():
-        filename = f"clean_{name.replace('_master', '')}.csv"
-        # We keep the _master suffix logic or just simplify?
-        # User requested: clean_results.csv, clean_lap_times.csv, clean_pit_stops.csv
-        # The keys are results_master, lap_times_master...
-        # Let's map strict names
-        if name == 'results_master':
-            filename = 'clean_results.csv'
-        elif name == 'lap_times_master':
-            filename = 'clean_lap_times.csv'
-        elif name == 'pit_stops_master':
-            filename = 'clean_pit_stops.csv'
-            
-        print(f"Saving {filename} (Shape: {df.shape})...")
-        df.to_csv(f"data/{filename}", index=False)
-        print("Saved.")
+        stem = EXPORT_NAMES[name]
+        table = table_for(stem)
+
+        if stem.startswith('dim_'):
+            path = dimension_path(stem, fmt)
+            # dim_races gains/replaces rows per race; the others are rewritten whole
+            if 'raceId' in df.columns and os.path.exists(path):
+                old = pd.read_parquet(path) if fmt == 'parquet' else pd.read_csv(path)
+                df = pd.concat([old[~old['raceId'].isin(race_ids)], df], ignore_index=True)
+            _replace_file(apply_schema(df, table), path, fmt)
+            print(f"Updated {os.path.basename(path)}")
+        elif fmt == 'parquet':
+            out_dir = os.path.join(DATA_DIR, stem)
+            for year in sorted(years):
+                part_dir = os.path.join(out_dir, f"year={year}")
+                part_path = os.path.join(part_dir, "part-0.parquet")
+                part = df[df['year'] == year].drop(columns=['year'])
+                if os.path.isdir(part_dir):
+                    old = pd.read_parquet(part_dir)
+                    part = pd.concat([old[~old['raceId'].isin(race_ids)], part], ignore_index=True)
+                # Concatenated categoricals fall back to object; restore the schema
+                part = apply_schema(part, table)
+
+                if part.empty:
+                    shutil.rmtree(part_dir, ignore_errors=True)
+                    continue
+                os.makedirs(part_dir, exist_ok=True)
+                _replace_file(part, part_path, fmt)
+                # A streamed export leaves one file per chunk; they are folded into part-0 now
+                for filename in os.listdir(part_dir):
+                    if filename != "part-0.parquet":
+                        os.remove(os.path.join(part_dir, filename))
+            print(f"Updated {stem}/ partitions: {sorted(years)}")
+        else:
+            path = os.path.join(DATA_DIR, f"{stem}.csv")
+            old = pd.read_csv(path)
+            updated = pd.concat([old[~old['raceId'].isin(race_ids)], df], ignore_index=True)
+            _replace_file(updated, path, fmt)
+            print(f"Updated {stem}.csv (Shape: {updated.shape})")
+
+def read_export(stem, fmt, columns=None):
+    """Read back an exported clean table (any layout) from DATA_DIR."""
+    if fmt == 'parquet':
+        return pd.read_parquet(os.path.join(DATA_DIR, stem), columns=columns)
+    return pd.read_csv(os.path.join(DATA_DIR, f"{stem}.csv"), usecols=columns)
+
+def refresh_lap_store(fmt):
+    """Rebuild the memory-mapped lap store from the exported lap table.
+
+    Reading the export back (only the stored columns) works the same after a
+    full, streamed or incremental run.
+    """
+    start = time.perf_counter()
+    laps = read_export(EXPORT_NAMES['lap_times_master'], fmt, ['raceId'] + list(LAP_STORE_COLUMNS))
+    build_lap_store(laps, os.path.join(DATA_DIR, "lap_store"))
+    STAGE_TIMINGS["lap store"] = time.perf_counter() - start
+
+def refresh_database(fmt):
+    """Rebuild the SQLite query backend (data/f1.sqlite) from the exported tables."""
+    start = time.perf_counter()
+    stems = [EXPORT_NAMES[name] for name in ['results_master', 'lap_times_master', 'pit_stops_master']]
+    # The schema restores the integer partition key that Parquet reads back as a string
+    tables = {table_for(stem): apply_schema(read_export(stem, fmt), table_for(stem)) for stem in stems}
+    build_database(tables, os.path.join(DATA_DIR, "f1.sqlite"))
+    STAGE_TIMINGS["sqlite"] = time.perf_counter() - start
+
+def write_table_summary(fmt):
+    """Write per-table row counts and dataset coverage to SUMMARY_PATH.
+
+    Counted from narrow reads of the exports after every run, so the landing
+    page can show them without loading any table.
+    """
+    results = read_export(EXPORT_NAMES['results_master'], fmt, ['raceId', 'driverId', 'year'])
+    years = pd.to_numeric(results['year'])
+    summary = {
+        'format': fmt,
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'races': int(results['raceId'].nunique()),
+        'drivers': int(results['driverId'].nunique()),
+        'seasons': [int(years.min()), int(years.max())] if len(years) else [],
+        'tables': {'results': {'rows': len(results)}}
+    }
+    for name in ['lap_times_master', 'pit_stops_master']:
+        stem = EXPORT_NAMES[name]
+        summary['tables'][table_for(stem)] = {'rows': len(read_export(stem, fmt, ['raceId']))}
+    with open(SUMMARY_PATH, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+def data_version(manifest):
+    """Short content fingerprint of the ingested data (all race and dimension hashes)."""
+    payload = json.dumps([manifest['dimensions'], manifest['races']], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+STINT_LAP_COLUMNS = ['raceId', 'driverId', 'lap', 'milliseconds']
+
+def iter_lap_export(fmt, columns, race_ids=None, years=None, chunksize=LAP_CHUNKSIZE):
+    """The exported laps in bounded pieces: one year partition at a time for
+    Parquet, chunksize rows at a time for CSV. Only race_ids (and, for
+    Parquet, only the partitions of years) when given."""
+    stem = EXPORT_NAMES['lap_times_master']
+    if fmt == 'parquet':
+        out_dir = os.path.join(DATA_DIR, stem)
+        for name in sorted(os.listdir(out_dir)):
+            if not name.startswith("year=") or (years is not None and int(name[5:]) not in years):
+                continue
+            part = pd.read_parquet(os.path.join(out_dir, name), columns=columns)
+            yield part if race_ids is None else part[part['raceId'].isin(race_ids)]
+    else:
+        for chunk in pd.read_csv(os.path.join(DATA_DIR, f"{stem}.csv"), usecols=columns, chunksize=chunksize):
+            yield chunk if race_ids is None else chunk[chunk['raceId'].isin(race_ids)]
+
+def build_stints(lap_chunks, pits, results):
+    """stint_table over lap chunks, fitting about one chunk at a time.
+
+    The exports keep each race's rows together, but a race may run over
+    from one chunk into the next, so the last race of every chunk is
+    carried into the next one before it is fitted.
+    """
+    pieces = []
+    carry = None
+    for chunk in lap_chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+        is_last = (chunk['raceId'] == chunk['raceId'].iloc[-1]).to_numpy()
+        carry = chunk[is_last]
+        pieces.append(stint_table(chunk[~is_last], pits, results))
+    if carry is not None:
+        pieces.append(stint_table(carry, pits, results))
+    stints = pd.concat(pieces, ignore_index=True) if pieces else \
+        stint_table(pd.DataFrame({c: pd.Series(dtype='int64') for c in STINT_LAP_COLUMNS}), pits, results)
+    return stints.sort_values(['raceId', 'driverId', 'stint']).reset_index(drop=True)
+
+def refresh_aggregates(fmt, version=None, race_ids=None, years=None, chunksize=LAP_CHUNKSIZE):
+    """Rebuild the dashboard summary tables (data/aggregates/) from the exports.
+
+    The stint table is fitted from the lap export chunk by chunk. On an
+    incremental run (race_ids/years of the changed and removed races) only
+    those races are refitted and the other rows of the previous table kept.
+    """
+    start = time.perf_counter()
+    out_dir = os.path.join(DATA_DIR, "aggregates")
+    results = apply_schema(read_export(EXPORT_NAMES['results_master'], fmt), 'results')
+    pits = apply_schema(read_export(EXPORT_NAMES['pit_stops_master'], fmt), 'pit_stops')
+    standings = None
+    if export_exists(EXPORT_NAMES['driver_standings_master'], fmt):
+        standings = apply_schema(read_export(EXPORT_NAMES['driver_standings_master'], fmt), 'driver_standings')
+    tables = build_aggregates(results, pits, standings=standings)
+
+    previous = read_aggregate('stints', out_dir) if race_ids is not None else None
+    if previous is not None:
+        laps = iter_lap_export(fmt, STINT_LAP_COLUMNS, race_ids=race_ids, years=years, chunksize=chunksize)
+        changed = build_stints(laps, pits, results)
+        kept = previous[~previous['raceId'].isin(race_ids)]
+        stints = pd.concat([kept, apply_schema(changed, 'stints')], ignore_index=True)
+        stints = stints.sort_values(['raceId', 'driverId', 'stint']).reset_index(drop=True)
+    else:
+        stints = build_stints(iter_lap_export(fmt, STINT_LAP_COLUMNS, chunksize=chunksize), pits, results)
+    # Categories of the kept and refitted rows are unioned by the cast
+    tables['stints'] = apply_schema(stints, 'stints')
+    write_aggregates(tables, fmt=fmt, data_version=version, out_dir=out_dir)
+    STAGE_TIMINGS["aggregates"] = time.perf_counter() - start
+
+def refresh_arrow(fmt):
+    """Rebuild the memory-mapped Arrow IPC copies (data/arrow/) the dashboard workers share."""
+    start = time.perf_counter()
+    for name in ['results_master', 'lap_times_master', 'pit_stops_master']:
+        stem = EXPORT_NAMES[name]
+        table = table_for(stem)
+        write_arrow(apply_schema(read_export(stem, fmt), table), table, os.path.join(DATA_DIR, "arrow"))
+    STAGE_TIMINGS["arrow"] = time.perf_counter() - start
+
+def refresh_derived(fmt, manifest, lap_store=False, sqlite=False, arrow=False,
+                    race_ids=None, years=None, chunksize=LAP_CHUNKSIZE):
+    """Rebuild everything read from the exports.
+
+    Optional copies are built when their flag is given and kept in step on
+    every later run once they exist, since the dashboard prefers them over
+    the exports. race_ids/years limit the stint refit of an incremental run.
+    """
+    write_table_summary(fmt)
+    refresh_aggregates(fmt, data_version(manifest), race_ids, years, chunksize)
+    if lap_store or os.path.isdir(os.path.join(DATA_DIR, "lap_store")):
+        refresh_lap_store(fmt)
+    if sqlite or database_exists(os.path.join(DATA_DIR, "f1.sqlite")):
+        refresh_database(fmt)
+    if arrow or os.path.isdir(os.path.join(DATA_DIR, "arrow")):
+        refresh_arrow(fmt)
+
+def run_pipeline(fmt='csv', incremental=False, stream_laps=False, chunksize=LAP_CHUNKSIZE,
+                 workers=DEFAULT_WORKERS, pool='thread', layout='denormalized', lap_store=False,
+                 sqlite=False, arrow=False):
+    path = get_source_path()
+    data = load_data(path, exclude=['lap_times'] if stream_laps else (), workers=workers, pool=pool)
+    manifest = build_manifest(data, fmt, layout)
+
+    if incremental:
+        previous = load_manifest()
+        if previous is None or not exports_exist(fmt, layout):
+            print("No previous export found, running full rebuild.")
+        elif previous.get('format') != fmt or previous.get('layout', 'denormalized') != layout:
+            print(f"Previous export was {previous.get('format')}/{previous.get('layout')}, running full rebuild.")
+        elif previous['dimensions'] != manifest['dimensions']:
+            print("Driver/constructor tables changed, running full rebuild.")
+        elif export_exists(EXPORT_NAMES['driver_standings_master'], fmt) != ('driver_standings' in data):
+            print("Driver standings were added to or removed from the source, running full rebuild.")
+        else:
+            changed, removed, years = diff_manifests(previous, manifest)
+            if not changed and not removed:
+                print("\nClean outputs are up to date.")
+                return
+            print(f"\nIncremental update: {len(changed)} new/changed, {len(removed)} removed races")
+            merged = merge_data(clean_data(filter_races(data, changed)), layout=layout)
+            if merged:
+                update_exports(merged, changed | removed, years, fmt=fmt)
+                refresh_derived(fmt, manifest, lap_store, sqlite, arrow,
+                                race_ids=changed | removed, years=years, chunksize=chunksize)
+                save_manifest(manifest)
+                print_timings()
+                print("\nIncremental Update Complete!")
+            return
 
-if __name__ == "__main__":
-    data = load_data()
     data = clean_data(data)
-    merged = merge_data(data)
+    merged = merge_data(data, include_laps=not stream_laps, layout=layout)
     if merged:
-        export_data(merged)
+        export_data(merged, fmt=fmt, workers=workers, pool=pool)
+        if 'driver_standings_master' not in merged:
+            remove_export(EXPORT_NAMES['driver_standings_master'])
+        if stream_laps:
+            # Dimensions are cleaned; free the other facts before streaming
+            for name in ['results', 'pit_stops', 'qualifying', 'driver_standings']:
+                data.pop(name, None)
+            del merged
+            start = time.perf_counter()
+            extend_manifest(manifest, stream_lap_times(path, data, fmt=fmt, chunksize=chunksize, layout=layout))
+            STAGE_TIMINGS["stream lap_times"] = time.perf_counter() - start
+        refresh_derived(fmt, manifest, lap_store, sqlite, arrow, chunksize=chunksize)
+        save_manifest(manifest)
+        print_timings()
         print("\nPipeline Complete!")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="F1 data preparation pipeline")
+    parser.add_argument(
+        "--format", dest="fmt", choices=["csv", "parquet"], default="csv",
+        help="Output format for the clean tables (parquet is partitioned by year)"
+    )
+    parser.add_argument(
+        "--layout", choices=LAYOUTS, default="denormalized",
+        help="star keeps lap/pit tables narrow and writes dim_races/dim_drivers/dim_constructors"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--incremental", action="store_true",
+        help="Only re-process races whose source rows changed since the last run"
+    )
+    mode.add_argument(
+        "--stream-laps", action="store_true",
+        help="Full rebuild that reads, enriches and writes lap_times in bounded-memory chunks"
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=LAP_CHUNKSIZE,
+        help="lap_times rows per chunk with --stream-laps"
+    )
+    parser.add_argument(
+        "--lap-store", action="store_true",
+        help="Also build the memory-mapped per-race lap store in data/lap_store "
+             "(rebuilt on every later run while the folder exists)"
+    )
+    parser.add_argument(
+        "--sqlite", action="store_true",
+        help="Also build the indexed SQLite query backend in data/f1.sqlite "
+             "(rebuilt on every later run while the file exists)"
+    )
+    parser.add_argument(
+        "--arrow", action="store_true",
+        help="Also build the memory-mapped Arrow copies in data/arrow that dashboard workers share "
+             "(rebuilt on every later run while the folder exists)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help="Concurrent table reads/writes"
+    )
+    parser.add_argument(
+        "--pool", choices=["thread", "process"], default="thread",
+        help="Worker pool type for table reads/writes"
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_pipeline(fmt=args.fmt, incremental=args.incremental,
+                 stream_laps=args.stream_laps, chunksize=args.chunksize,
+                 workers=args.workers, pool=args.pool, layout=args.layout,
+                 lap_store=args.lap_store, sqlite=args.sqlite, arrow=args.arrow)
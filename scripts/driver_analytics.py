@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
 
@@ -8,67 +9,35 @@ import seaborn as sns
 plt.style.use('ggplot') # Try a built-in style first to avoid seaborn dependency issues if any
 sns.set_theme(style="whitegrid")
 
+# Make the repo root importable so the scripts share the dashboard's reader
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import read_table
+
 OUTPUT_DIR = "images"
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 
 def load_data():
     print("Loading datasets...")
-    results = pd.read_csv("data/clean_results.csv")
-    laps = pd.read_csv("data/clean_lap_times.csv")
-    pits = pd.read_csv("data/clean_pit_stops.csv")
-    
-    # Load status.csv (hardcoded path based on previous find command or relative assuming standard structure if we copied it, but better use absolute for now or try to find it)
-    # The previous turn found it at:
-    # /Users/punarvashu/.cache/kagglehub/datasets/rohanrao/formula-1-world-championship-1950-2020/versions/24/status.csv
-    # We'll try to use that path or a fallback
-    status_path = "data/status.csv"
-    if os.path.exists(status_path):
-        status = pd.read_csv(status_path)
-    else:
-        # Fallback: check if it's in the current directory or data folder if copied
-        # For now, we assume it's there or we might fail. 
-        # Let's try to load it from the same place as others if the user moved it, but likely not.
-        print("WARNING: status.csv not found at expected path. Trying local directory.")
-        try:
-            status = pd.read_csv("status.csv")
-        except FileNotFoundError:
-            print("ERROR: status.csv not found. DNF analysis will be limited.")
-            status = pd.DataFrame(columns=['statusId', 'status'])
-            
+    # Includes position_gain, is_win, is_podium, is_dnf and status_category from data_prep
+    results = read_table("results")
+    # Only the columns feature_engineering aggregates over
+    laps = read_table("lap_times", columns=['raceId', 'driverId', 'milliseconds'])
+    pits = read_table("pit_stops", columns=['raceId', 'driverId', 'stop', 'milliseconds'])
+    
     print(f"Loaded Results: {results.shape}")
     print(f"Loaded Laps: {laps.shape}")
     print(f"Loaded Pits: {pits.shape}")
     
-    return results, laps, pits, status
+    return results, laps, pits
 
-def feature_engineering(results, laps, pits, status):
+def feature_engineering(results, laps, pits):
     print("\n--- Feature Engineering ---")
     
-    # 1. Position Gain
-    # If grid is 0 (pit lane start often), treat as last or handle carefully. 
-    # But usually 0 means pit lane. Let's assume gain is valid if grid > 0.
-    results['position_gain'] = np.where(results['grid'] > 0, results['grid'] - results['positionOrder'], 0)
-    
-    # 2. Key Flags
-    results['win_flag'] = (results['positionOrder'] == 1).astype(int)
-    results['podium_flag'] = (results['positionOrder'] <= 3).astype(int)
-    
-    # 3. DNF Flag
-    # Map statusId to status descriptions
-    results = pd.merge(results, status, on='statusId', how='left')
-    
-    # Common "Finished" statuses: 1 (Finished), 11 (+1 Lap), 12 (+2 Laps), etc.
-    # We can perform a simpler check: if status is NOT 'Finished' and NOT '+N Laps' -> DNF?
-    # Or typically statusId 1 is Finished.
-    # Let's list IDs that represent finishing:
-    # 1: Finished
-    # 11-19: +X Laps
-    # We can check the string content too.
-    finished_mask = results['status'].str.contains('Finished|Lag|\+.*Lap', case=False, regex=True, na=False)
-    results['dnf_flag'] = (~finished_mask).astype(int)
-    
-    # 4. Pit Stop Metrics (Aggregated per driver-race)
+    # Position gain and the win/podium/DNF flags are derived once at ingest
+    # (data_prep.py feature stage); only the per-race lap and pit metrics are added here.
+    
+    # 1. Pit Stop Metrics (Aggregated per driver-race)
     pit_agg = pits.groupby(['raceId', 'driverId']).agg(
         pit_stop_count=('stop', 'max'),
         avg_pit_duration=('milliseconds', 'mean')
@@ -77,7 +46,7 @@ def feature_engineering(results, laps, pits, status):
     results = pd.merge(results, pit_agg, on=['raceId', 'driverId'], how='left')
     results['pit_stop_count'] = results['pit_stop_count'].fillna(0)
     
-    # 5. Lap Time Metrics (Aggregated per driver-race)
+    # 2. Lap Time Metrics (Aggregated per driver-race)
     # We can calculate consistency here: std dev of lap times per race
     lap_agg = laps.groupby(['raceId', 'driverId']).agg(
         avg_race_lap_time=('milliseconds', 'mean'),
@@ -86,19 +55,22 @@ def feature_engineering(results, laps, pits, status):
     
     results = pd.merge(results, lap_agg, on=['raceId', 'driverId'], how='left')
     
-    print("Features added: position_gain, win_flag, podium_flag, dnf_flag, pit metrics, lap metrics.")
+    print("Features added: pit metrics, lap metrics.")
     return results
 
 def compute_driver_analytics(df):
     print("\n--- Computing Driver Analytics ---")
     
+    # Pit-lane starts (grid 0) count as no gain here
+    df = df.assign(position_gain=np.where(df['grid'] > 0, df['position_gain'], 0))
+    
     # Group by Driver
-    driver_stats = df.groupby(['driverId', 'driver_name']).agg(
+    driver_stats = df.groupby(['driverId', 'driver_name'], observed=True).agg(
         total_races=('raceId', 'count'),
         total_points=('points', 'sum'),
-        total_wins=('win_flag', 'sum'),
-        total_podiums=('podium_flag', 'sum'),
-        total_dnfs=('dnf_flag', 'sum'),
+        total_wins=('is_win', 'sum'),
+        total_podiums=('is_podium', 'sum'),
+        total_dnfs=('is_dnf', 'sum'),
         avg_finish_pos=('positionOrder', 'mean'),
         global_consistency=('positionOrder', 'std'), # Lower is better
         avg_position_gain=('position_gain', 'mean')
@@ -232,10 +204,10 @@ Percentage of races finished on the podium.
     print("Report generated: reports/driver_intelligence_report.md")
 
 if __name__ == "__main__":
-    results, laps, pits, status = load_data()
+    results, laps, pits = load_data()
     
     # Process
-    results_enriched = feature_engineering(results, laps, pits, status)
+    results_enriched = feature_engineering(results, laps, pits)
     driver_stats = compute_driver_analytics(results_enriched)
     
     # Visualize
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
 
@@ -8,15 +9,21 @@ import seaborn as sns
 plt.style.use('ggplot')
 sns.set_theme(style="whitegrid")
 
+# Make the repo root importable so the scripts share the dashboard's reader
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import read_table
+from pace import add_pace_columns
+
 OUTPUT_DIR = "images"
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 
 def load_data():
     print("Loading datasets for Strategy Analysis...")
-    results = pd.read_csv("data/clean_results.csv")
-    laps = pd.read_csv("data/clean_lap_times.csv")
-    pits = pd.read_csv("data/clean_pit_stops.csv")
+    results = read_table("results")
+    # driver_name is attached later for the selected race only
+    laps = read_table("lap_times", columns=['raceId', 'driverId', 'lap', 'milliseconds'])
+    pits = read_table("pit_stops")
     return results, laps, pits
 
 def analyze_lap_pace(laps, results, target_race_id=1073):
@@ -53,15 +60,12 @@ def analyze_lap_pace(laps, results, target_race_id=1073):
         driver_map = results[['driverId', 'driver_name']].drop_duplicates()
         race_laps_top = pd.merge(race_laps_top, driver_map, on='driverId', how='left')
 
-    # Calculate Rolling Average (Window=3)
-    race_laps_top = race_laps_top.sort_values(['driverId', 'lap'])
-    race_laps_top['rolling_lap_time'] = race_laps_top.groupby('driverId')['milliseconds'].transform(lambda x: x.rolling(window=3).mean())
+    # Calculate Rolling Average (Window=3), in seconds for readability
+    race_laps_top = add_pace_columns(race_laps_top, windows=[3])
+    race_laps_top['seconds'] = race_laps_top['pace_3']
     
     # Filter valid rolling times
-    race_laps_top = race_laps_top.dropna(subset=['rolling_lap_time'])
-    
-    # Convert milliseconds to seconds for readability
-    race_laps_top['seconds'] = race_laps_top['rolling_lap_time'] / 1000
+    race_laps_top = race_laps_top.dropna(subset=['seconds'])
     
     plt.figure(figsize=(14, 8))
     sns.lineplot(data=race_laps_top, x='lap', y='seconds', hue='driver_name', linewidth=2)
@@ -113,7 +117,7 @@ def analyze_pit_strategy(pits, results):
     pits_clean = pits_top_teams[pits_top_teams['stop_seconds'] < 40] 
 
     plt.figure(figsize=(12, 6))
-    order = pits_clean.groupby('constructor_name')['stop_seconds'].median().sort_values().index
+    order = pits_clean.groupby('constructor_name', observed=True)['stop_seconds'].median().sort_values().index
     sns.boxplot(data=pits_clean, x='constructor_name', y='stop_seconds', order=order, palette='Set3')
     plt.title("Team Pit Stop Performance (2014-2020) - Distribution")
     plt.xlabel("Constructor")
@@ -131,18 +135,13 @@ def analyze_circuit_intelligence(results):
     # We use (Grid - Finish Position).
     # Filter out DNFs? Typically overtaking stats exclude DNFs or handle them.
     # We'll map DNFs to NaN gain or exclude them for pure overtaking stats.
-    # Results already has `position_gain` calculated in `driver_analytics.py` step... 
-    # Wait, clean_results.csv DOES NOT have position_gain unless we explicitly saved it in previous step.
-    # We calculated it in memory in `driver_analytics.py` but didn't save it back to CSV maybe.
-    # Let's recalculate it.
-    
-    results['position_gain'] = results['grid'] - results['positionOrder']
+    # `position_gain` is derived once by data_prep.py and stored in clean_results.
     
     # Exclude races where grid was 0 (often pit lane start) to avoid skew
     valid_results = results[results['grid'] > 0]
     
     # Aggregate by Circuit (race_name)
-    circuit_stats = valid_results.groupby('race_name').agg(
+    circuit_stats = valid_results.groupby('race_name', observed=True).agg(
         avg_gain=('position_gain', 'mean'), # Net gain (can be negative due to drops)
         abs_gain=('position_gain', lambda x: x.abs().mean()), # Activity level (up or down)
         count=('raceId', 'nunique') # Number of races held
@@ -0,0 +1,310 @@
+"""Synthetic F1 source tables for scaling tests.
+
+Writes the same CSV files, columns and conventions (\\N for missing values)
+as the Kaggle "Formula 1 World Championship" dataset that data_prep.py
+ingests, at a multiple of real history size. scale=1 is roughly the real
+dataset (~1,100 races, ~27k results, ~550k laps); scale=10 and scale=100
+extend history with more seasons, drivers and constructors.
+
+Seasons are generated in blocks and appended to the CSVs, so memory stays
+bounded even at scale=100.
+
+Usage:
+    python scripts/synthetic_data.py --scale 10 --out data/synthetic/x10
+"""
+import os
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+# Real-history shape at scale=1
+SEASONS = 75
+FIRST_YEAR = 1950
+RACES_PER_SEASON = 15
+ENTRANTS_PER_RACE = 24
+DRIVERS = 860
+CONSTRUCTORS = 210
+CIRCUITS = 77
+# Lap times (and pit stops) are only recorded for recent history, as in the real data
+LAP_HISTORY_SHARE = 0.4
+PIT_HISTORY_SHARE = 0.2
+
+# Seasons generated and appended per block
+SEASON_BLOCK = 25
+
+POINTS = np.array([25, 18, 15, 12, 10, 8, 6, 4, 2, 1], dtype=float)
+FINISHED_STATUS = {1: "Finished", 11: "+1 Lap", 12: "+2 Laps", 13: "+3 Laps"}
+RETIRED_STATUS = {3: "Accident", 4: "Collision", 5: "Engine", 6: "Gearbox",
+                  7: "Transmission", 9: "Hydraulics", 10: "Electrical", 20: "Spun off"}
+NATIONALITIES = ["British", "German", "Italian", "French", "Brazilian", "Finnish",
+                 "Spanish", "Dutch", "Australian", "American", "Japanese", "Mexican"]
+FORENAMES = ["Lewis", "Max", "Charles", "Fernando", "Sebastian", "Kimi", "Nico",
+             "Jenson", "Mark", "Felipe", "Ayrton", "Alain", "Niki", "Jim", "Jackie"]
+SURNAMES = ["Hamilton", "Verstappen", "Leclerc", "Alonso", "Vettel", "Raikkonen",
+            "Rosberg", "Button", "Webber", "Massa", "Senna", "Prost", "Lauda", "Clark"]
+GRAND_PRIX = ["Australian", "Bahrain", "Chinese", "Spanish", "Monaco", "Canadian",
+              "French", "British", "German", "Hungarian", "Belgian", "Italian",
+              "Singapore", "Japanese", "Brazilian", "Abu Dhabi", "Austrian", "Dutch"]
+
+def _lap_time_text(ms):
+    """Kaggle-style m:ss.mmm lap time strings."""
+    ms = np.asarray(ms, dtype='int64')
+    minutes, rest = np.divmod(ms, 60_000)
+    seconds, millis = np.divmod(rest, 1000)
+    return pd.Series(minutes.astype(str)).str.cat(
+        [pd.Series(seconds).map('{:02d}'.format), pd.Series(millis).map('{:03d}'.format)],
+        sep=':'
+    ).str.replace(r':(\d{3})$', r'.\1', regex=True)
+
+def _race_time_text(ms):
+    """Kaggle-style h:mm:ss.mmm race time strings."""
+    ms = np.asarray(ms, dtype='int64')
+    hours, rest = np.divmod(ms, 3_600_000)
+    return pd.Series(hours).astype(str) + ':' + _lap_time_text(rest).str.zfill(9)
+
+def _write(df, path, append):
+    df.to_csv(path, mode='a' if append else 'w', header=not append, index=False, na_rep='\\N')
+
+def dimension_tables(scale, rng):
+    """drivers, constructors and status tables (small, written in one go)."""
+    n_drivers = DRIVERS * scale
+    driver_ids = np.arange(1, n_drivers + 1)
+    forenames = np.array(FORENAMES)[rng.integers(len(FORENAMES), size=n_drivers)]
+    surnames = np.array(SURNAMES)[rng.integers(len(SURNAMES), size=n_drivers)]
+    # Suffix the id so names stay unique like the real table
+    surnames = pd.Series(surnames) + ' ' + pd.Series(driver_ids).astype(str)
+    drivers = pd.DataFrame({
+        'driverId': driver_ids,
+        'driverRef': 'driver_' + pd.Series(driver_ids).astype(str),
+        'number': np.where(rng.random(n_drivers) < 0.7, np.nan, rng.integers(1, 100, n_drivers)),
+        'code': surnames.str[:3].str.upper(),
+        'forename': forenames,
+        'surname': surnames,
+        'dob': pd.to_datetime('1920-01-01') + pd.to_timedelta(
+            (driver_ids / n_drivers * SEASONS * scale * 365).astype(int), unit='D'),
+        'nationality': np.array(NATIONALITIES)[rng.integers(len(NATIONALITIES), size=n_drivers)],
+        'url': 'http://en.wikipedia.org/wiki/Driver_' + pd.Series(driver_ids).astype(str),
+    })
+    drivers['number'] = drivers['number'].astype('Int16')
+    drivers['dob'] = drivers['dob'].dt.strftime('%Y-%m-%d')
+
+    n_constructors = CONSTRUCTORS * scale
+    constructor_ids = np.arange(1, n_constructors + 1)
+    constructors = pd.DataFrame({
+        'constructorId': constructor_ids,
+        'constructorRef': 'team_' + pd.Series(constructor_ids).astype(str),
+        'name': 'Team ' + pd.Series(constructor_ids).astype(str),
+        'nationality': np.array(NATIONALITIES)[rng.integers(len(NATIONALITIES), size=n_constructors)],
+        'url': 'http://en.wikipedia.org/wiki/Team_' + pd.Series(constructor_ids).astype(str),
+    })
+
+    status = pd.DataFrame(
+        [{'statusId': k, 'status': v} for k, v in {**FINISHED_STATUS, **RETIRED_STATUS}.items()]
+    ).sort_values('statusId')
+    return drivers, constructors, status
+
+def season_block(seasons, scale, rng, first_race_id, n_seasons_total):
+    """All race-level tables for a block of season indexes (0-based)."""
+    n_drivers = DRIVERS * scale
+    n_constructors = CONSTRUCTORS * scale
+    n_races = len(seasons) * RACES_PER_SEASON
+    race_ids = np.arange(first_race_id, first_race_id + n_races)
+    season_of_race = np.repeat(seasons, RACES_PER_SEASON)
+    years = FIRST_YEAR + season_of_race
+    rounds = np.tile(np.arange(1, RACES_PER_SEASON + 1), len(seasons))
+    circuit_ids = rng.integers(1, CIRCUITS + 1, n_races)
+    race_dates = (pd.to_datetime(pd.Series(years).astype(str) + '-03-01')
+                  + pd.to_timedelta((rounds - 1) * 14, unit='D'))
+    races = pd.DataFrame({
+        'raceId': race_ids,
+        'year': years,
+        'round': rounds,
+        'circuitId': circuit_ids,
+        'name': np.array(GRAND_PRIX)[circuit_ids % len(GRAND_PRIX)] + ' Grand Prix',
+        'date': race_dates.dt.strftime('%Y-%m-%d'),
+        'time': np.where(years >= 2005, '14:00:00', None),
+        'url': 'http://en.wikipedia.org/wiki/Race_' + pd.Series(race_ids).astype(str),
+    })
+
+    # Each season fields a sliding window of the driver and constructor pools
+    entrants = ENTRANTS_PER_RACE
+    driver_offset = (season_of_race * (n_drivers - entrants) // max(n_seasons_total - 1, 1))
+    entry_slot = np.tile(np.arange(entrants), n_races)
+    driver_ids = np.repeat(driver_offset, entrants) + entry_slot + 1
+    constructor_offset = (season_of_race * (n_constructors - entrants // 2) // max(n_seasons_total - 1, 1))
+    constructor_ids = np.repeat(constructor_offset, entrants) + entry_slot // 2 + 1
+    result_race = np.repeat(race_ids, entrants)
+    # Every race has the same entry list size, so row ids follow from raceId
+    row_ids = (result_race - 1) * entrants + entry_slot + 1
+
+    # Finishing order: driver skill plus race-day noise
+    skill = -entry_slot * 0.15 + rng.normal(0, 1.5, n_races * entrants)
+    order = np.lexsort((-skill, result_race))
+    position_order = np.empty(n_races * entrants, dtype='int64')
+    position_order[order] = np.tile(np.arange(1, entrants + 1), n_races)
+    grid = np.clip(position_order + rng.integers(-6, 7, position_order.size), 1, entrants)
+    grid[rng.random(grid.size) < 0.02] = 0  # pit-lane starts
+
+    race_laps = np.repeat(rng.integers(50, 72, n_races), entrants)
+    retired = rng.random(position_order.size) < 0.15
+    # Retirements are classified behind the finishers
+    position_order = np.where(retired, entrants + 1, position_order)
+    position_order = pd.Series(position_order).groupby(result_race).rank(method='first').astype(int).to_numpy()
+    laps = np.where(retired, (race_laps * rng.random(race_laps.size)).astype(int),
+                    race_laps - np.clip(position_order - 12, 0, 3))
+    status_id = np.where(
+        retired, rng.choice(list(RETIRED_STATUS), size=retired.size),
+        np.where(laps < race_laps, 10 + (race_laps - laps), 1)
+    )
+    points = np.where(~retired & (position_order <= len(POINTS)),
+                      POINTS[np.clip(position_order, 1, len(POINTS)) - 1], 0.0)
+    base_lap_ms = np.repeat(rng.integers(75_000, 105_000, n_races), entrants)
+    race_ms = np.where(retired | (laps < race_laps), np.nan,
+                       base_lap_ms * laps + position_order * rng.integers(500, 8000, laps.size))
+    fastest_lap = np.where(laps > 0, rng.integers(1, np.maximum(laps, 1) + 1), 0)
+    fastest_ms = (base_lap_ms * rng.uniform(0.97, 1.0, laps.size)).astype(int)
+    results = pd.DataFrame({
+        'resultId': row_ids,
+        'raceId': result_race,
+        'driverId': driver_ids,
+        'constructorId': constructor_ids,
+        'number': entry_slot + 1,
+        'grid': grid,
+        'position': pd.array(np.where(retired, np.nan, position_order), dtype='Int64'),
+        'positionText': np.where(retired, 'R', position_order.astype(str)),
+        'positionOrder': position_order,
+        'points': points,
+        'laps': laps,
+        'time': np.where(np.isnan(race_ms), None, _race_time_text(np.nan_to_num(race_ms)).to_numpy()),
+        'milliseconds': pd.array(race_ms, dtype='Int64'),
+        'fastestLap': pd.array(np.where(laps > 0, fastest_lap, np.nan), dtype='Int64'),
+        'rank': pd.array(np.where(laps > 0, position_order, np.nan), dtype='Int64'),
+        'fastestLapTime': np.where(laps > 0, _lap_time_text(fastest_ms).to_numpy(), None),
+        'fastestLapSpeed': np.round(5_000_000 / fastest_ms * 3.6, 3),
+        'statusId': status_id,
+    })
+
+    # Qualifying mirrors the grid
+    qualifying = pd.DataFrame({
+        'qualifyId': row_ids,
+        'raceId': result_race,
+        'driverId': driver_ids,
+        'constructorId': constructor_ids,
+        'number': entry_slot + 1,
+        'position': np.clip(grid, 1, None),
+        'q1': _lap_time_text(base_lap_ms * 0.98 + grid * 40).to_numpy(),
+        'q2': np.where(grid <= 15, _lap_time_text(base_lap_ms * 0.975 + grid * 40).to_numpy(), None),
+        'q3': np.where(grid <= 10, _lap_time_text(base_lap_ms * 0.97 + grid * 40).to_numpy(), None),
+    })
+
+    # Standings after every race: cumulative points and wins within the season
+    standings = results[['raceId', 'driverId', 'points']].copy()
+    standings['season'] = np.repeat(season_of_race, entrants)
+    standings['wins'] = ((position_order == 1) & ~retired).astype(int)
+    standings[['points', 'wins']] = standings.groupby(['season', 'driverId'])[['points', 'wins']].cumsum()
+    standings['position'] = standings.groupby('raceId')['points'].rank(method='first', ascending=False).astype(int)
+    standings['positionText'] = standings['position'].astype(str)
+    standings.insert(0, 'driverStandingsId', row_ids)
+    standings = standings[['driverStandingsId', 'raceId', 'driverId', 'points', 'position', 'positionText', 'wins']]
+
+    # Lap-by-lap timing for recent history only
+    lap_from = int(n_seasons_total * (1 - LAP_HISTORY_SHARE))
+    lap_rows = season_of_race.repeat(entrants) >= lap_from
+    lap_times = pd.DataFrame()
+    if lap_rows.any():
+        n_laps = laps[lap_rows]
+        lap_race = result_race[lap_rows].repeat(n_laps)
+        lap_driver = driver_ids[lap_rows].repeat(n_laps)
+        starts = np.cumsum(n_laps) - n_laps
+        lap_no = np.arange(n_laps.sum()) - starts.repeat(n_laps) + 1
+        lap_ms = (base_lap_ms[lap_rows].repeat(n_laps)
+                  + position_order[lap_rows].repeat(n_laps) * 60
+                  + lap_no * 25  # tyre degradation
+                  + rng.gamma(2.0, 400, lap_no.size)).astype(int)
+        lap_ms[lap_no == 1] += 6000
+        lap_times = pd.DataFrame({'raceId': lap_race, 'driverId': lap_driver, 'lap': lap_no, 'milliseconds': lap_ms})
+        elapsed = lap_times.groupby(['raceId', 'driverId'])['milliseconds'].cumsum()
+        lap_times['position'] = elapsed.groupby([lap_times['raceId'], lap_times['lap']]).rank(method='first').astype(int)
+        lap_times['time'] = _lap_time_text(lap_ms).to_numpy()
+        lap_times = lap_times[['raceId', 'driverId', 'lap', 'position', 'time', 'milliseconds']]
+
+    # One to three stops per classified-length stint, recent history only
+    pit_from = int(n_seasons_total * (1 - PIT_HISTORY_SHARE))
+    pit_rows = (season_of_race.repeat(entrants) >= pit_from) & (laps > 10)
+    pit_stops = pd.DataFrame()
+    if pit_rows.any():
+        n_stops = rng.integers(1, 4, pit_rows.sum())
+        stop_race = result_race[pit_rows].repeat(n_stops)
+        stop_driver = driver_ids[pit_rows].repeat(n_stops)
+        stop_no = np.arange(n_stops.sum()) - (np.cumsum(n_stops) - n_stops).repeat(n_stops) + 1
+        stint = laps[pit_rows].repeat(n_stops) // (n_stops.repeat(n_stops) + 1)
+        stop_ms = rng.normal(24_000, 2_500, stop_no.size).clip(18_000, None).astype(int)
+        # A few long stops (repairs, red flags) like the real data
+        stop_ms[rng.random(stop_ms.size) < 0.02] *= 20
+        pit_stops = pd.DataFrame({
+            'raceId': stop_race,
+            'driverId': stop_driver,
+            'stop': stop_no,
+            'lap': stint * stop_no,
+            'time': (pd.to_datetime('14:00:00', format='%H:%M:%S')
+                     + pd.to_timedelta(stint * stop_no * 90, unit='s')).strftime('%H:%M:%S'),
+            'duration': np.round(stop_ms / 1000, 3),
+            'milliseconds': stop_ms,
+        })
+
+    return {
+        'races': races,
+        'results': results,
+        'qualifying': qualifying,
+        'driver_standings': standings,
+        'lap_times': lap_times,
+        'pit_stops': pit_stops,
+    }
+
+def generate_dataset(out_dir, scale=1, seed=0):
+    """Write the source CSVs for `scale` times real history to out_dir.
+
+    Returns table name -> row count.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    print(f"Generating synthetic dataset x{scale} in {out_dir}")
+
+    drivers, constructors, status = dimension_tables(scale, rng)
+    rows = {}
+    for name, df in [('drivers', drivers), ('constructors', constructors), ('status', status)]:
+        _write(df, os.path.join(out_dir, f"{name}.csv"), append=False)
+        rows[name] = len(df)
+
+    n_seasons = SEASONS * scale
+    next_race_id = 1
+    written = set()
+    for block_start in range(0, n_seasons, SEASON_BLOCK):
+        seasons = np.arange(block_start, min(block_start + SEASON_BLOCK, n_seasons))
+        tables = season_block(seasons, scale, rng, next_race_id, n_seasons)
+        next_race_id += len(tables['races'])
+        for name, df in tables.items():
+            if df.empty:
+                continue
+            _write(df, os.path.join(out_dir, f"{name}.csv"), append=name in written)
+            written.add(name)
+            rows[name] = rows.get(name, 0) + len(df)
+
+    for name, count in rows.items():
+        print(f"{name:<18}{count:>12,} rows")
+    print(f"Generated in {time.perf_counter() - start:.1f}s")
+    return rows
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic F1 source tables")
+    parser.add_argument("--scale", type=int, default=1, help="Multiple of real history size (1, 10, 100)")
+    parser.add_argument("--out", default=None, help="Output directory (default data/synthetic/x<scale>)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    generate_dataset(args.out or os.path.join("data", "synthetic", f"x{args.scale}"),
+                     scale=args.scale, seed=args.seed)
@@ -0,0 +1,113 @@
+"""Start the dashboard with its caches already warm.
+
+    python serve.py [--port 8501] [--profile-only]
+
+Imports the heavy modules, runs every cache warm-up registered with
+data_cache.register_warmup (the summary tables, the page selections each page
+opens on, the default season and race), and only then starts the Streamlit
+server in the same process. The server does not accept traffic, and
+/_stcore/health does not answer, until the first page view is a cache hit, so
+it can be used directly as a replica's readiness check.
+
+The import and warm-up timings are printed and written to
+benchmarks/startup_<timestamp>.json. `python -X importtime serve.py
+--profile-only` breaks the import figures down further.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import importlib
+import platform
+
+RESULTS_DIR = "benchmarks"
+
+# Imported in this order before the server starts; each step is timed on its
+# own, so a module's figure excludes what the earlier ones already loaded
+STARTUP_IMPORTS = ['numpy', 'pandas', 'pyarrow', 'streamlit', 'plotly.express', 'utils']
+
+def profile_imports(modules=STARTUP_IMPORTS):
+    """Import each module, returning {module, seconds, new_modules} records."""
+    records = []
+    for name in modules:
+        loaded = len(sys.modules)
+        start = time.perf_counter()
+        importlib.import_module(name)
+        records.append({'module': name, 'seconds': round(time.perf_counter() - start, 3),
+                        'new_modules': len(sys.modules) - loaded})
+    return records
+
+def profile_warmup():
+    """Warm every registered cache for the live data version, returning {step, seconds} records."""
+    from data_cache import current_version, warm_caches
+
+    # Cached calls outside a server run warn once per cache; expected here
+    for logger in ['streamlit.runtime.caching.cache_data_api', 'streamlit.runtime.scriptrunner_utils.script_run_context']:
+        logging.getLogger(logger).setLevel(logging.ERROR)
+    start = time.perf_counter()
+    version = current_version()
+    records = [{'step': 'fingerprint', 'seconds': round(time.perf_counter() - start, 3)}]
+    records += [{'step': step, 'seconds': round(seconds, 3)} for step, seconds in warm_caches(version)]
+    return version, records
+
+def print_report(profile):
+    print("\n--- Startup Profile ---")
+    for record in profile['imports']:
+        print(f"  import {record['module']:<20}{record['seconds']:8.3f}s  ({record['new_modules']} modules)")
+    for record in profile['warmup']:
+        print(f"  warm   {record['step']:<40}{record['seconds']:8.3f}s")
+    print(f"  total  {profile['total_seconds']:.2f}s (data version {profile['data_version']})")
+
+def warm_up(output=None):
+    """Import, warm and profile; returns the profile and writes it to RESULTS_DIR."""
+    start = time.perf_counter()
+    imports = profile_imports()
+    version, warmup = profile_warmup()
+    profile = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'data_version': version,
+        'imports': imports,
+        'warmup': warmup,
+        'total_seconds': round(time.perf_counter() - start, 3),
+    }
+    print_report(profile)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = output or os.path.join(RESULTS_DIR, f"startup_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(profile, f, indent=2)
+    print(f"Startup profile written to {output}")
+    return profile
+
+def serve(port=None, address=None):
+    """Start the Streamlit server on app.py in this process (keeping the warm caches).
+
+    Like `streamlit run`, data/ is resolved against the working directory.
+    """
+    from streamlit.web import bootstrap
+
+    flag_options = {'server.headless': True}
+    if port is not None:
+        flag_options['server.port'] = port
+    if address is not None:
+        flag_options['server.address'] = address
+    bootstrap.load_config_options(flag_options=flag_options)
+    bootstrap.run(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), False, [], flag_options)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Warm the dashboard caches, then start the server")
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--address", default=None)
+    parser.add_argument("--profile-only", action="store_true",
+                        help="Write the startup profile and exit without starting the server")
+    parser.add_argument("--output", default=None, help="Profile file (default benchmarks/startup_<timestamp>.json)")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    warm_up(output=args.output)
+    if not args.profile_only:
+        serve(port=args.port, address=args.address)
@@ -0,0 +1,146 @@
+"""Optional embedded SQLite backend for the dashboard.
+
+The clean tables are copied into a single SQLite file indexed on raceId,
+driverId, year and circuitId. With F1_BACKEND=sqlite the helpers in utils push
+their filters and aggregations down as queries, so only the result rows reach
+Python instead of every page holding the full frames.
+
+Built by `python scripts/data_prep.py --sqlite` or `python sql_backend.py`.
+SQLite ships with Python, so the backend adds no dependency.
+"""
+import os
+import sqlite3
+from contextlib import closing
+import pandas as pd
+
+DB_PATH = os.path.join("data", "f1.sqlite")
+
+# Columns indexed in every table that has them
+INDEX_COLUMNS = ['raceId', 'driverId', 'year', 'circuitId']
+
+
+def build_database(tables, db_path=DB_PATH):
+    """Write tables (name -> DataFrame) into a fresh database and index them.
+
+    The file is built next to the target and swapped in, so running
+    dashboards never see a half-written database.
+    """
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    with closing(sqlite3.connect(tmp_path)) as conn:
+        for name, df in tables.items():
+            df.to_sql(name, conn, index=False, chunksize=100_000)
+            for col in INDEX_COLUMNS:
+                if col in df.columns:
+                    conn.execute(f'CREATE INDEX idx_{name}_{col} ON "{name}" ("{col}")')
+            print(f"Loaded {name} into SQLite ({len(df):,} rows)")
+        conn.execute("ANALYZE")
+        conn.commit()
+
+    os.replace(tmp_path, db_path)
+    print(f"Database written to {db_path}")
+    return db_path
+
+def database_exists(db_path=DB_PATH):
+    return os.path.exists(db_path)
+
+def query(sql, params=(), db_path=DB_PATH):
+    """Run a read-only query and return the rows as a DataFrame.
+
+    A short-lived connection per query keeps this safe to call from
+    Streamlit's script threads.
+    """
+    uri = f"file:{os.path.abspath(db_path)}?mode=ro"
+    with closing(sqlite3.connect(uri, uri=True)) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+def driver_stats(db_path=DB_PATH):
+    """Career aggregates per driver; `consistency` is the sample std of positionOrder."""
+    stats = query("""
+        SELECT driverId, driver_name,
+               COUNT(raceId) AS total_races,
+               SUM(points) AS total_points,
+               SUM(is_win) AS wins,
+               SUM(is_podium) AS podiums,
+               SUM(is_dnf) AS dnfs,
+               AVG(positionOrder) AS avg_finish,
+               (SUM(positionOrder * positionOrder) - SUM(positionOrder) * SUM(positionOrder) * 1.0 / COUNT(*))
+                   / NULLIF(COUNT(*) - 1, 0) AS position_var,
+               AVG(position_gain) AS avg_gain
+        FROM results
+        WHERE driver_name IS NOT NULL
+        GROUP BY driverId, driver_name
+        ORDER BY driverId
+    """, db_path=db_path)
+    # SQLite has no sqrt without the optional math extension
+    stats['consistency'] = stats.pop('position_var').clip(lower=0) ** 0.5
+    return stats
+
+def constructor_pit_stops(min_year=None, max_seconds=40, db_path=DB_PATH):
+    """Pit stops under max_seconds with the constructor of the driver that stopped."""
+    sql = """
+        SELECT p.raceId, p.driverId, p.stop, p.lap, p.year, p.milliseconds,
+               r.constructor_name, p.milliseconds / 1000.0 AS seconds
+        FROM pit_stops p
+        JOIN (SELECT DISTINCT raceId, driverId, constructor_name FROM results) r
+          ON r.raceId = p.raceId AND r.driverId = p.driverId
+        WHERE p.milliseconds < ?
+    """
+    params = [max_seconds * 1000]
+    if min_year is not None:
+        sql += " AND p.year >= ?"
+        params.append(int(min_year))
+    return query(sql, params, db_path=db_path)
+
+def circuit_overtaking(min_races=10, db_path=DB_PATH):
+    """Mean absolute grid-to-finish change per race name (pit-lane starts excluded)."""
+    return query("""
+        SELECT race_name,
+               AVG(ABS(grid - positionOrder)) AS overtaking_score,
+               COUNT(DISTINCT raceId) AS races_held
+        FROM results
+        WHERE grid > 0
+        GROUP BY race_name
+        HAVING COUNT(DISTINCT raceId) >= ?
+    """, [int(min_races)], db_path=db_path)
+
+def results_where(column, values, db_path=DB_PATH):
+    """Result rows whose column is one of values."""
+    values = [int(v) for v in values]
+    if not values:
+        values = [-1]
+    placeholders = ', '.join('?' * len(values))
+    return query(f"SELECT * FROM results WHERE {column} IN ({placeholders})",
+                 values, db_path=db_path)
+
+def race_laps(race_id, db_path=DB_PATH):
+    return query("""
+        SELECT raceId, driverId, lap, milliseconds FROM lap_times
+        WHERE raceId = ? ORDER BY driverId, lap
+    """, [int(race_id)], db_path=db_path)
+
+def seasons(db_path=DB_PATH):
+    years = query("SELECT DISTINCT year FROM results ORDER BY year DESC", db_path=db_path)['year']
+    # Databases built from Parquet before the schema was applied hold the year as TEXT
+    return sorted((int(y) for y in years), reverse=True)
+
+def season_races(year, db_path=DB_PATH):
+    return query("""
+        SELECT DISTINCT raceId, race_name, round FROM results
+        WHERE year = ? ORDER BY round
+    """, [int(year)], db_path=db_path)
+
+def dataset_summary(db_path=DB_PATH):
+    row = query("""
+        SELECT (SELECT COUNT(DISTINCT raceId) FROM results) AS races,
+               (SELECT COUNT(DISTINCT driverId) FROM results) AS drivers,
+               (SELECT COUNT(*) FROM lap_times) AS laps
+    """, db_path=db_path)
+    return {key: int(value) for key, value in row.iloc[0].items()}
+
+if __name__ == "__main__":
+    from utils import read_table
+
+    build_database({name: read_table(name) for name in ['results', 'lap_times', 'pit_stops']})
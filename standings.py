@@ -0,0 +1,326 @@
+"""Championship standings of every season as dense round-by-driver arrays.
+
+`build_standings` turns the per-round points of all seasons (the
+season_points aggregate) into one padded (season, round, driver) tensor and
+derives, in a few array operations over all seasons together:
+
+    cumulative   running points total after each round
+    position     championship position after each round (equal totals share it)
+    gap          points behind the leader after each round
+    leader       column of the sole leader after each round (a shared lead
+                 keeps the previous leader)
+    remaining    most points a driver can still score after each round
+    contention   whether each driver can still reach the leader's total
+
+Each season is then a `SeasonStandings` of views into those arrays, with its
+driver columns ordered by final standing, so the top n contenders are the
+first n columns and a gap between any two drivers is a column difference.
+Switching seasons is a dictionary lookup. The clinch round is the first round
+after which only one driver remains in contention; `title_deciders` lists
+it for every season.
+
+A race's available points are the most any driver scored in it, and at
+least the season's usual race maximum (the median over its races), so a
+fastest lap point the winner missed or a double-points finale still count.
+Points the official standings add on top of a round's race results
+(sprints) count towards that round as well. Seasons whose official totals
+dropped scores have no clinch round, since a driver's total there is not
+bounded by the points still available. A season still in progress is
+treated as complete.
+
+Seasons covered by the official driver standings take their totals,
+positions and final order from them, so dropped scores and sprint points
+count as they did; a round's points are then the change in the official
+total. Other seasons fall back to raw sums of the points awarded per race.
+Each season records whether its official totals dropped scores or carried
+points from outside the race results (sprints).
+"""
+import numpy as np
+import pandas as pd
+
+def competition_rank(values, axis=-1):
+    """1 + the number of larger values along axis, so equal values share the best rank."""
+    values = np.moveaxis(values, axis, -1)
+    order = np.argsort(-values, axis=-1, kind='stable')
+    ordered = np.take_along_axis(values, order, -1)
+    new_value = np.ones(ordered.shape, dtype=bool)
+    new_value[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+    first = np.maximum.accumulate(np.where(new_value, np.arange(values.shape[-1]), 0), axis=-1)
+    ranks = np.empty(values.shape, dtype='int16')
+    np.put_along_axis(ranks, order, (first + 1).astype('int16'), -1)
+    return np.moveaxis(ranks, -1, axis)
+
+def points_remaining(tensor, n_rounds, extra=None):
+    """Most points one driver can still score after each (season, round).
+
+    tensor holds each driver's points per (season, round); rounds beyond a
+    season's n_rounds are padding. extra, per (season, round), adds points
+    awarded outside the race results (sprints).
+    """
+    valid = np.arange(tensor.shape[1])[None, :] < n_rounds[:, None]
+    race_max = tensor.max(axis=2)
+    usual = np.nanmedian(np.where(valid, race_max, np.nan), axis=1)
+    available = np.where(valid, np.maximum(race_max, usual[:, None]), 0)
+    if extra is not None:
+        available = available + np.where(valid, extra, 0)
+    return available[:, ::-1].cumsum(axis=1)[:, ::-1] - available
+
+def fill_forward(values):
+    """Carry the last non-NaN value along axis 1 (rounds); NaN before the first."""
+    rounds = np.arange(values.shape[1]).reshape((1, -1) + (1,) * (values.ndim - 2))
+    last = np.maximum.accumulate(np.where(np.isnan(values), 0, rounds), axis=1)
+    return np.take_along_axis(values, last, axis=1)
+
+def sole_leader(cumulative, present):
+    """Column of the sole points leader per (season, round), carried over rounds
+    where the lead is shared; -1 until someone leads alone."""
+    totals = np.where(present[:, None, :], cumulative, -np.inf)
+    best = totals.max(axis=-1, keepdims=True)
+    alone = (totals == best).sum(axis=-1) == 1
+    leader = np.where(alone, totals.argmax(axis=-1), -1)
+
+    # Carry the last sole leader forward through shared leads
+    rounds = np.arange(leader.shape[1])
+    last_alone = np.maximum.accumulate(np.where(alone, rounds, -1), axis=1)
+    carried = np.take_along_axis(leader, np.maximum(last_alone, 0), axis=1)
+    return np.where(last_alone >= 0, carried, -1)
+
+class SeasonStandings:
+    """Standings of one season: (round, driver) arrays with drivers in final order."""
+
+    def __init__(self, year, rounds, race_ids, race_names, driver_ids, driver_names,
+                 points, cumulative, position, gap, leader, remaining, contention,
+                 official=False, dropped_scores=False, extra_points=False):
+        self.year = year
+        self.rounds = rounds
+        self.race_ids = race_ids
+        self.race_names = race_names
+        self.driver_ids = driver_ids
+        self.driver_names = driver_names
+        self.points = points
+        self.cumulative = cumulative
+        self.position = position
+        self.gap = gap
+        self.leader = leader
+        self.remaining = remaining
+        self.contention = contention
+        # Totals from the official standings, and what they count beyond the race points
+        self.official = official
+        self.dropped_scores = dropped_scores
+        self.extra_points = extra_points
+        decided = np.flatnonzero(contention.sum(axis=1) == 1)
+        self.clinch_index = int(decided[0]) if len(decided) else None
+        self._columns = {int(d): i for i, d in enumerate(driver_ids)}
+
+    def column(self, driver_id):
+        return self._columns[int(driver_id)]
+
+    def contenders(self, n=3):
+        """driverIds of the top n in the final standings."""
+        return [int(d) for d in self.driver_ids[:n]]
+
+    def gap_between(self, driver_a, driver_b):
+        """Points of driver_a minus driver_b after every round."""
+        return self.cumulative[:, self.column(driver_a)] - self.cumulative[:, self.column(driver_b)]
+
+    @property
+    def clinch_round(self):
+        """Round after which the title could no longer be lost (None when it
+        was only settled on countback, or the season dropped scores)."""
+        return None if self.clinch_index is None else int(self.rounds[self.clinch_index])
+
+    def in_contention(self, round_index):
+        """driverIds that could still win the title after the round at round_index."""
+        return [int(d) for d in self.driver_ids[self.contention[round_index]]]
+
+    def eliminations(self):
+        """driverId, driver_name and the round after which each driver could no
+        longer win the title (NaN for the champion and drivers tied with them)."""
+        out = ~self.contention
+        eliminated = np.where(out.any(axis=0), self.rounds[out.argmax(axis=0)], np.nan)
+        return pd.DataFrame({
+            'driverId': self.driver_ids,
+            'driver_name': self.driver_names,
+            'eliminated_round': eliminated,
+        })
+
+    def progression(self, driver_ids=None):
+        """Long frame (round, race_name, driverId, driver_name, points,
+        cumulative_points, position, gap_to_leader) for the given drivers,
+        all drivers by default, sorted by round."""
+        columns = np.arange(len(self.driver_ids)) if driver_ids is None else \
+            np.array([self.column(d) for d in driver_ids], dtype='int64')
+        n_rounds = len(self.rounds)
+        return pd.DataFrame({
+            'round': np.repeat(self.rounds, len(columns)),
+            'race_name': np.repeat(self.race_names, len(columns)),
+            'driverId': np.tile(self.driver_ids[columns], n_rounds),
+            'driver_name': np.tile(self.driver_names[columns], n_rounds),
+            'points': self.points[:, columns].ravel(),
+            'cumulative_points': self.cumulative[:, columns].ravel(),
+            'position': self.position[:, columns].ravel(),
+            'gap_to_leader': self.gap[:, columns].ravel(),
+        })
+
+    def lead_changes(self):
+        """Rounds where a different driver took the sole lead: round, race_name,
+        driverId/driver_name of the new leader and previous_leader (the first lead included)."""
+        change = np.flatnonzero((self.leader >= 0) & (self.leader != np.r_[-1, self.leader[:-1]]))
+        new = self.leader[change]
+        previous = np.r_[-1, self.leader[:-1]][change]
+        names = np.r_[self.driver_names, None]
+        return pd.DataFrame({
+            'round': self.rounds[change],
+            'race_name': self.race_names[change],
+            'driverId': self.driver_ids[new],
+            'driver_name': self.driver_names[new],
+            'previous_leader': names[previous],
+        })
+
+def build_standings(season_points, driver_standings=None):
+    """{year: SeasonStandings} for every season in season_points (year, round,
+    raceId, race_name, driverId, driver_name, points), computed together.
+
+    driver_standings (year, round, driverId, driver_name, points, position),
+    the official totals after each round, overrides the raw sums for the
+    seasons it covers.
+    """
+    points = season_points[['year', 'round', 'raceId', 'race_name', 'driverId', 'driver_name', 'points']]
+    if points.empty:
+        return {}
+    points = points.assign(
+        year=points['year'].astype('int64'), round=points['round'].astype('int64'),
+        race_name=points['race_name'].astype(str), driver_name=points['driver_name'].astype(str))
+
+    # Row index: the season's rounds in order
+    races = points[['year', 'round', 'raceId', 'race_name']].drop_duplicates(['year', 'round']).sort_values(['year', 'round'])
+    races['row'] = races.groupby('year').cumcount()
+
+    official = pd.DataFrame(columns=['year', 'round', 'driverId', 'driver_name', 'points', 'position'])
+    if driver_standings is not None:
+        official = driver_standings[['year', 'round', 'driverId', 'driver_name', 'points', 'position']]
+        official = official.assign(
+            year=official['year'].astype('int64'), round=official['round'].astype('int64'),
+            driver_name=official['driver_name'].astype(str),
+            position=official['position'].astype('float64')).merge(races[['year', 'round']], on=['year', 'round'])
+
+    # Column index: final standing, the official one where there is one
+    entrants = pd.concat([points[['year', 'driverId', 'driver_name']], official[['year', 'driverId', 'driver_name']]])
+    drivers = entrants.drop_duplicates(['year', 'driverId']).reset_index(drop=True)
+    keys = pd.MultiIndex.from_frame(drivers[['year', 'driverId']])
+    drivers['total'] = points.groupby(['year', 'driverId'])['points'].sum().reindex(keys).fillna(0).to_numpy()
+    final = official.sort_values('round', kind='stable').groupby(['year', 'driverId'])['position'].last()
+    drivers['final_position'] = final.reindex(keys).to_numpy(dtype='float64')
+    drivers = drivers.sort_values(['year', 'final_position', 'total', 'driverId'],
+                                  ascending=[True, True, False, True], na_position='last', kind='stable')
+    drivers['column'] = drivers.groupby('year').cumcount()
+
+    years = races['year'].unique()
+    season_of = {int(y): i for i, y in enumerate(years)}
+    indexed = points.merge(races[['year', 'round', 'row']], on=['year', 'round']) \
+                    .merge(drivers[['year', 'driverId', 'column']], on=['year', 'driverId'])
+    shape = (len(years), int(races['row'].max()) + 1, int(drivers['column'].max()) + 1)
+    season = indexed['year'].map(season_of).to_numpy()
+    driver_season = drivers['year'].map(season_of).to_numpy()
+
+    tensor = np.zeros(shape)
+    np.add.at(tensor, (season, indexed['row'].to_numpy(), indexed['column'].to_numpy()),
+              indexed['points'].to_numpy(dtype='float64'))
+    present = np.zeros((shape[0], shape[2]), dtype=bool)
+    present[driver_season, drivers['column'].to_numpy()] = True
+
+    cumulative = tensor.cumsum(axis=1)
+    ranked = np.where(present[:, None, :], cumulative, -np.inf)
+    position = competition_rank(ranked)
+
+    # Official totals and positions, carried over rounds a driver has no row in
+    rows = official.merge(races[['year', 'round', 'row']], on=['year', 'round']) \
+                   .merge(drivers[['year', 'driverId', 'column']], on=['year', 'driverId'])
+    cells = (rows['year'].map(season_of).to_numpy(), rows['row'].to_numpy(), rows['column'].to_numpy())
+    recorded = np.full(shape, np.nan)
+    recorded[cells] = rows['points'].to_numpy(dtype='float64')
+    recorded_position = np.full(shape, np.nan)
+    recorded_position[cells] = rows['position'].to_numpy(dtype='float64')
+    covered = np.zeros(shape[0], dtype=bool)
+    covered[cells[0]] = True
+    recorded = np.nan_to_num(fill_forward(recorded))
+    recorded_position = fill_forward(recorded_position)
+
+    cumulative = np.where(covered[:, None, None], recorded, cumulative)
+    position = np.where(covered[:, None, None] & ~np.isnan(recorded_position),
+                        np.nan_to_num(recorded_position), position).astype('int16')
+    ranked = np.where(present[:, None, :], cumulative, -np.inf)
+    gap = ranked.max(axis=-1, keepdims=True) - cumulative
+    round_points = np.diff(cumulative, axis=1, prepend=0)
+
+    # The official leader is P1, ties already settled on countback
+    first = recorded_position == 1
+    leader = np.where(covered[:, None], np.where(first.any(axis=-1), first.argmax(axis=-1), -1),
+                      sole_leader(cumulative, present))
+
+    # Official final totals below the race points dropped scores; above them
+    # they hold points the results do not (sprints)
+    final, raced = cumulative[:, -1, :], tensor.sum(axis=1)
+    dropped_scores = covered & (present & (final < raced - 1e-6)).any(axis=-1)
+    extra_points = covered & (present & (final > raced + 1e-6)).any(axis=-1)
+
+    # Most points each round awarded beyond its race results
+    extra = np.where((covered & ~dropped_scores)[:, None],
+                     np.clip(round_points - tensor, 0, None).max(axis=-1), 0)
+
+    # Still in contention: current total plus every point left reaches the
+    # leader; with dropped scores nobody can be ruled out on totals
+    n_rounds = races.groupby('year').size().reindex(years).to_numpy()
+    remaining = points_remaining(tensor, n_rounds, extra)
+    contention = present[:, None, :] & (
+        (cumulative + remaining[..., None] >= ranked.max(axis=-1, keepdims=True))
+        | dropped_scores[:, None, None])
+
+    standings = {}
+    race_groups = dict(tuple(races.groupby('year')))
+    driver_groups = dict(tuple(drivers.groupby('year')))
+    for year, i in season_of.items():
+        season_races = race_groups[year]
+        season_drivers = driver_groups[year]
+        n_rounds, n_drivers = len(season_races), len(season_drivers)
+        standings[year] = SeasonStandings(
+            year=year,
+            rounds=season_races['round'].to_numpy(),
+            race_ids=season_races['raceId'].to_numpy(),
+            race_names=season_races['race_name'].to_numpy(dtype=object),
+            driver_ids=season_drivers['driverId'].to_numpy(),
+            driver_names=season_drivers['driver_name'].to_numpy(dtype=object),
+            points=round_points[i, :n_rounds, :n_drivers],
+            cumulative=cumulative[i, :n_rounds, :n_drivers],
+            position=position[i, :n_rounds, :n_drivers],
+            gap=gap[i, :n_rounds, :n_drivers],
+            leader=leader[i, :n_rounds],
+            remaining=remaining[i, :n_rounds],
+            contention=contention[i, :n_rounds, :n_drivers],
+            official=bool(covered[i]),
+            dropped_scores=bool(dropped_scores[i]),
+            extra_points=bool(extra_points[i]),
+        )
+    return standings
+
+def title_deciders(standings):
+    """One row per season: year, champion (driverId, driver_name), rounds,
+    clinch_round, clinch_race, rounds_to_spare, the final margin over P2 and
+    whether the season dropped scores or had points beyond the race results."""
+    rows = []
+    for year, season in sorted(standings.items()):
+        final = season.cumulative[-1]
+        index = season.clinch_index
+        rows.append({
+            'year': year,
+            'driverId': int(season.driver_ids[0]),
+            'driver_name': season.driver_names[0],
+            'rounds': len(season.rounds),
+            'clinch_round': season.clinch_round,
+            'clinch_race': None if index is None else season.race_names[index],
+            'rounds_to_spare': None if index is None else len(season.rounds) - 1 - index,
+            'margin': float(final[0] - final[1]) if len(final) > 1 else float(final[0]),
+            'dropped_scores': season.dropped_scores,
+            'extra_points': season.extra_points,
+        })
+    return pd.DataFrame(rows).astype({'clinch_round': 'Int8', 'rounds_to_spare': 'Int8'})
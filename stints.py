@@ -0,0 +1,121 @@
+"""Stint segmentation and tyre degradation fits for every driver-race.
+
+A driver's race is split into stints at their pit stops: a stop on lap L
+ends the stint with L as its in-lap, and lap L+1 (the out-lap) starts the
+next one. Each stint's representative laps are then fitted with
+
+    lap_seconds = intercept + degradation * tyre_age
+
+where tyre_age counts laps from the start of the stint. All stints are
+fitted at once. The per-stint sums of x, y, x*x and x*y come from a few
+np.bincount calls, which solves the normal equations of every 2-parameter
+least-squares problem together, with no loop over stints.
+
+The slope is the raw lap time trend. Fuel burn-off (which makes later laps
+faster) is not removed, so absolute values understate tyre wear; rankings
+between races and teams are comparable.
+"""
+import numpy as np
+
+# Laps excluded from fits: lap 1 (standing start), in- and out-laps, and laps
+# slower than SLOW_LAP_RATIO times the driver's race median (safety car, incidents)
+SLOW_LAP_RATIO = 1.07
+
+# Stints with fewer representative laps get no fit
+MIN_FIT_LAPS = 5
+
+# raceId/driverId/lap packed into one sortable int64
+_LAP_SPAN = 1_000
+_DRIVER_SPAN = 100_000
+
+def _codes(race_ids, driver_ids, laps=None):
+    key = race_ids.astype('int64') * _DRIVER_SPAN + driver_ids.astype('int64')
+    return key * _LAP_SPAN + (0 if laps is None else laps.astype('int64'))
+
+def segment_stints(laps, pits):
+    """laps sorted by (raceId, driverId, lap) with stint, tyre_age and fit_lap columns.
+
+    laps needs raceId, driverId, lap and milliseconds; pits needs raceId,
+    driverId and lap. stint starts at 1; fit_lap marks laps used in fits.
+    """
+    laps = laps.sort_values(['raceId', 'driverId', 'lap'], kind='stable').reset_index(drop=True)
+    race_ids = laps['raceId'].to_numpy()
+    driver_ids = laps['driverId'].to_numpy()
+    lap = laps['lap'].to_numpy().astype('int64')
+
+    # Stops of the same driver-race on an earlier lap = completed stints
+    pit_codes = np.sort(_codes(pits['raceId'].to_numpy(), pits['driverId'].to_numpy(), pits['lap'].to_numpy()))
+    lap_codes = _codes(race_ids, driver_ids, lap)
+    first_codes = _codes(race_ids, driver_ids)
+    stops_before = np.searchsorted(pit_codes, lap_codes, side='left') - np.searchsorted(pit_codes, first_codes, side='left')
+    in_lap = np.searchsorted(pit_codes, lap_codes, side='right') - np.searchsorted(pit_codes, lap_codes, side='left') > 0
+    out_lap = np.searchsorted(pit_codes, lap_codes - 1, side='right') - np.searchsorted(pit_codes, lap_codes - 1, side='left') > 0
+    stint = stops_before + 1
+
+    # Tyre age: position within the stint (rows of a stint are consecutive)
+    stint_codes = first_codes * 100 + stint
+    starts = np.flatnonzero(np.r_[True, stint_codes[1:] != stint_codes[:-1]]) if len(laps) else np.array([], dtype='int64')
+    tyre_age = np.arange(len(laps)) - np.repeat(starts, np.diff(np.r_[starts, len(laps)]))
+
+    milliseconds = laps['milliseconds'].to_numpy().astype('float64')
+    race_median = laps.groupby(['raceId', 'driverId'], sort=False)['milliseconds'].transform('median').to_numpy()
+    laps['stint'] = stint.astype('int8')
+    laps['tyre_age'] = tyre_age.astype('int16')
+    laps['fit_lap'] = (lap > 1) & ~in_lap & ~out_lap & (milliseconds <= race_median * SLOW_LAP_RATIO)
+    return laps
+
+def fit_stints(stint_laps, min_fit_laps=MIN_FIT_LAPS):
+    """One row per stint with its lap range and fitted intercept/degradation (seconds).
+
+    stint_laps is segment_stints output. Stints with fewer than min_fit_laps
+    representative laps keep their row with NaN fit columns.
+    """
+    keys = ['raceId', 'driverId', 'stint']
+    stints = stint_laps.groupby(keys, sort=False).agg(
+        start_lap=('lap', 'min'),
+        end_lap=('lap', 'max'),
+        laps=('lap', 'size'),
+    ).reset_index()
+    stint_id = stint_laps.groupby(keys, sort=False).ngroup().to_numpy()
+    count = len(stints)
+
+    fit = stint_laps['fit_lap'].to_numpy()
+    ids = stint_id[fit]
+    x = stint_laps['tyre_age'].to_numpy()[fit].astype('float64')
+    y = stint_laps['milliseconds'].to_numpy()[fit].astype('float64') / 1000
+
+    n = np.bincount(ids, minlength=count).astype('float64')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Center per stint so the sums stay small next to the ~90 s lap times
+        x_mean = np.bincount(ids, x, minlength=count) / n
+        y_mean = np.bincount(ids, y, minlength=count) / n
+        dx = x - x_mean[ids]
+        dy = y - y_mean[ids]
+        sxx = np.bincount(ids, dx * dx, minlength=count)
+        sxy = np.bincount(ids, dx * dy, minlength=count)
+        syy = np.bincount(ids, dy * dy, minlength=count)
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+        rmse = np.sqrt(np.maximum(syy - slope * sxy, 0) / (n - 2))
+
+    valid = (n >= min_fit_laps) & (sxx > 0)
+    stints['fit_laps'] = n.astype('int16')
+    stints['intercept_s'] = np.where(valid, intercept, np.nan)
+    stints['degradation_s_per_lap'] = np.where(valid, slope, np.nan)
+    stints['rmse_s'] = np.where(valid, rmse, np.nan)
+    return stints
+
+def stint_table(laps, pits, results=None):
+    """Fitted stints of every driver-race with recorded pit stops, with year,
+    race_name, driver_name and constructor_name attached from results when given.
+
+    Races without any pit stop data (before 2011 in the source) are left out,
+    as their stints cannot be told apart.
+    """
+    laps = laps[laps['raceId'].isin(pits['raceId'].unique())]
+    stints = fit_stints(segment_stints(laps, pits))
+    if results is not None:
+        labels = results[['raceId', 'driverId', 'year', 'race_name', 'driver_name', 'constructor_name']]
+        labels = labels.drop_duplicates(['raceId', 'driverId'])
+        stints = stints.merge(labels, on=['raceId', 'driverId'], how='left')
+    return stints.sort_values(['raceId', 'driverId', 'stint']).reset_index(drop=True)
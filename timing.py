@@ -0,0 +1,194 @@
+"""Per-page timing and memory instrumentation for the dashboard.
+
+Each page calls `begin_page(name)` first and `end_page()` last. In between,
+functions decorated with `@timed()` and blocks wrapped in `with stage(...)`
+record their wall time and the change in process RSS. Stages nest: a stage
+that runs inside another records its depth. Outside a page run, for example
+in scripts or the warm-up, both are no-ops.
+
+`end_page()` appends one JSON line per page run to TIMING_LOG
+(env F1_TIMING_LOG; empty disables it). When F1_DEBUG=1 is set, or the URL
+has ?debug=1, it also shows the stages in a sidebar panel. Run
+`python timing.py [log]` for the p50/p95 of every page and stage.
+"""
+import os
+import sys
+import json
+import time
+import resource
+import threading
+import functools
+from contextlib import contextmanager
+
+TIMING_LOG = os.environ.get("F1_TIMING_LOG", os.path.join("logs", "timings.jsonl"))
+DEBUG = os.environ.get("F1_DEBUG", "0") == "1"
+
+_PAGE_SIZE_MB = os.sysconf('SC_PAGE_SIZE') / 1e6 if hasattr(os, 'sysconf') else None
+
+# The run being recorded in the calling thread (one Streamlit script run per thread)
+_local = threading.local()
+_log_lock = threading.Lock()
+
+def rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE_MB
+    except (OSError, TypeError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+class PageRun:
+    """Stage records of one page script run."""
+
+    def __init__(self, page):
+        self.page = page
+        self.stages = []
+        self.depth = 0
+        self.start = time.perf_counter()
+        self.start_rss = rss_mb()
+
+def current_run():
+    return getattr(_local, 'run', None)
+
+def begin_page(page):
+    """Start recording a page run in this thread."""
+    _local.run = PageRun(page)
+
+@contextmanager
+def stage(name):
+    """Record the time and RSS change of the enclosed block under name."""
+    run = current_run()
+    if run is None:
+        yield
+        return
+    record = {'stage': name, 'depth': run.depth}
+    run.stages.append(record)
+    run.depth += 1
+    start_rss = rss_mb()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record['ms'] = round((time.perf_counter() - start) * 1000, 2)
+        record['rss_mb'] = round(rss_mb() - start_rss, 1)
+        run.depth -= 1
+
+def timed(name=None):
+    """Decorator form of stage(); the stage defaults to the function name."""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_run() is None:
+                return func(*args, **kwargs)
+            with stage(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def debug_enabled():
+    if DEBUG:
+        return True
+    import streamlit as st
+    try:
+        return st.query_params.get('debug') == '1'
+    except Exception:
+        return False
+
+def end_page():
+    """Finish the page run: log it and, in debug mode, show it in the sidebar.
+
+    Returns the record (None when no run was started).
+    """
+    run = current_run()
+    if run is None:
+        return None
+    _local.run = None
+    record = {
+        'ts': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'page': run.page,
+        'total_ms': round((time.perf_counter() - run.start) * 1000, 2),
+        'rss_mb': round(rss_mb(), 1),
+        'rss_delta_mb': round(rss_mb() - run.start_rss, 1),
+        'stages': run.stages,
+    }
+    if TIMING_LOG:
+        write_record(record)
+    if debug_enabled():
+        show_panel(record)
+    return record
+
+def write_record(record, path=None):
+    path = path or TIMING_LOG
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps(record, default=str) + "\n"
+    with _log_lock:
+        with open(path, 'a') as f:
+            f.write(line)
+
+def show_panel(record):
+    import streamlit as st
+
+    with st.sidebar.expander(f"Timings: {record['total_ms']:.0f} ms", expanded=True):
+        rows = [{'stage': ' ' * s['depth'] + s['stage'], 'ms': s.get('ms'), 'rss MB': s.get('rss_mb')}
+                for s in record['stages']]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.caption(f"RSS {record['rss_mb']:.0f} MB ({record['rss_delta_mb']:+.1f} MB this run)")
+
+def read_log(path=TIMING_LOG):
+    records = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+def percentile(values, q):
+    """q-th percentile (0-100) with linear interpolation, like numpy's default."""
+    values = sorted(values)
+    if not values:
+        return float('nan')
+    pos = (len(values) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (pos - low)
+
+def summarize(records):
+    """{page: {'runs', 'p50', 'p95', 'stages': {stage: {'calls', 'p50', 'p95'}}}} in ms.
+
+    Stage percentiles are over the per-run totals of that stage.
+    """
+    pages = {}
+    for record in records:
+        page = pages.setdefault(record['page'], {'totals': [], 'stages': {}})
+        page['totals'].append(record['total_ms'])
+        per_run = {}
+        for s in record['stages']:
+            per_run[s['stage']] = per_run.get(s['stage'], 0) + s.get('ms', 0)
+        for name, ms in per_run.items():
+            page['stages'].setdefault(name, []).append(ms)
+
+    summary = {}
+    for name, page in pages.items():
+        summary[name] = {
+            'runs': len(page['totals']),
+            'p50': percentile(page['totals'], 50),
+            'p95': percentile(page['totals'], 95),
+            'stages': {stage_name: {'calls': len(ms), 'p50': percentile(ms, 50), 'p95': percentile(ms, 95)}
+                       for stage_name, ms in page['stages'].items()},
+        }
+    return summary
+
+def print_summary(summary):
+    print("\n--- Page Timings (ms) ---")
+    for page, stats in sorted(summary.items()):
+        print(f"{page:<40}{'runs':>6}{'p50':>10}{'p95':>10}")
+        print(f"{'  (total)':<40}{stats['runs']:>6}{stats['p50']:>10.1f}{stats['p95']:>10.1f}")
+        stages = sorted(stats['stages'].items(), key=lambda item: -item[1]['p95'])
+        for name, s in stages:
+            print(f"  {name[:38]:<38}{s['calls']:>6}{s['p50']:>10.1f}{s['p95']:>10.1f}")
+
+if __name__ == "__main__":
+    print_summary(summarize(read_log(sys.argv[1] if len(sys.argv) > 1 else TIMING_LOG)))
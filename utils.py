@@ -2,102 +2,528 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 import os
+import json
+import warnings
+from schema import apply_schema, category_columns, DIMENSIONS, STAR_TABLES
+from lap_store import open_lap_store
+from arrow_store import open_arrow, to_frame
+from features import add_result_features
+from pace import add_pace_columns, WINDOWS
+from stints import stint_table
+from standings import build_standings, title_deciders
+from rescoring import rescore, champions
+import aggregates
+from aggregates import add_rates, read_aggregate
+import sql_backend
+from data_cache import versioned, register_warmup, cached_figure
+from timing import timed, stage, begin_page, end_page
+from assets import base64_of_file
 
-@st.cache_data
-def load_data():
-    """Load and process F1 datasets."""
-    
-    # Load clean CSVs
+DATA_DIR = "data"
+SQL_DB_PATH = os.path.join(DATA_DIR, "f1.sqlite")
+SUMMARY_PATH = os.path.join(DATA_DIR, "table_summary.json")
+
+# Season the season pickers open on when it is available
+DEFAULT_SEASON = 2021
+
+def _read_clean(name, columns=None, years=None):
+    """Read a clean table, projecting only the requested columns and seasons.
+
+    Prefers the year-partitioned Parquet export (data/clean_<name>/) written by
+    `data_prep.py --format parquet`, where unused columns and seasons are never
+    read from disk. Falls back to data/clean_<name>.csv. Either way the result
+    carries the compact dtypes from schema.SCHEMA.
+    """
+    parquet_dir = os.path.join(DATA_DIR, f"clean_{name}")
+    if os.path.isdir(parquet_dir):
+        filters = [('year', 'in', [int(y) for y in years])] if years is not None else None
+        df = pd.read_parquet(parquet_dir, columns=columns, filters=filters)
+        return apply_schema(df, name)
+
+    usecols = columns
+    if columns is not None and years is not None and 'year' not in columns:
+        usecols = list(columns) + ['year']
+    # Parse string dimensions straight into categoricals to avoid an object copy
+    dtype = {col: 'category' for col in category_columns(name) if usecols is None or col in usecols}
+    df = pd.read_csv(os.path.join(DATA_DIR, f"clean_{name}.csv"), usecols=usecols, dtype=dtype)
+    if years is not None:
+        df = df[df['year'].isin(years)].reset_index(drop=True)
+        if columns is not None and 'year' not in columns:
+            df = df.drop(columns=['year'])
+    return apply_schema(df, name)
+
+def _dimension_path(name):
+    for ext in ['parquet', 'csv']:
+        path = os.path.join(DATA_DIR, f"dim_{name}.{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+def is_star_layout():
+    """True when data_prep.py --layout star wrote narrow lap/pit facts plus dim_* tables."""
+    return _dimension_path('races') is not None
+
+@versioned(max_entries=8)
+def load_dimension(name):
+    """Dimension table ('races', 'drivers' or 'constructors'): its key plus attributes.
+
+    Read from data/dim_<name> in the star layout. The denormalized export has no
+    dimension files, so the table is derived from clean_results, which carries
+    every race, driver and constructor attribute.
+    """
+    key, attributes = DIMENSIONS[name]
+    path = _dimension_path(name)
+    if path is None:
+        df = _read_clean('results', columns=[key] + attributes).drop_duplicates(key)
+    elif path.endswith('.parquet'):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, dtype={col: 'category' for col in category_columns(name)})
+    return apply_schema(df, name).reset_index(drop=True)
+
+@timed()
+def join_dimensions(df, columns):
+    """Attach dimension attributes (e.g. 'driver_name', 'race_name') to a narrow frame.
+
+    Call this after filtering, so only the rows a chart displays pay for the
+    join. Attributes the frame already has are left untouched.
+    """
+    for name, (key, attributes) in DIMENSIONS.items():
+        wanted = [col for col in columns if col in attributes and col not in df.columns]
+        if wanted and key in df.columns:
+            df = pd.merge(df, load_dimension(name)[[key] + wanted], on=key, how='left')
+    return df
+
+def read_table(name, columns=None, years=None):
+    """Read a clean table, projecting only the requested columns and seasons.
+
+    In the star layout lap_times and pit_stops are stored narrow. With
+    columns=None you get exactly what is on disk; dimension attributes named in
+    `columns` are joined on after the season filter.
+    """
+    if name in STAR_TABLES and columns is not None and is_star_layout():
+        # year stays on the facts as their partition key
+        attributes = [col for col in columns if col != 'year'
+                      and any(col in attrs for _, attrs in DIMENSIONS.values())]
+        if attributes:
+            keys = [key for key, attrs in DIMENSIONS.values() if set(attrs) & set(attributes)]
+            fact_columns = [col for col in columns if col not in attributes]
+            fact_columns += [key for key in keys if key not in fact_columns]
+            df = join_dimensions(_read_clean(name, fact_columns, years), attributes)
+            return df[list(columns)]
+    df = _read_clean(name, columns, years)
+    if name == 'results' and columns is None and 'is_dnf' not in df.columns:
+        # Export predates the feature stage; derive from statusId until data_prep.py is re-run
+        warnings.warn("clean_results has no derived features, re-run scripts/data_prep.py", stacklevel=2)
+        df = apply_schema(add_result_features(df), 'results')
+    return df
+
+@versioned(kind='resource', ttl=None, max_entries=2)
+def get_lap_store():
+    """Memory-mapped lap store shared by every session in this process, or None.
+
+    cache_resource hands out the same object instead of a pickled copy, so the
+    mapped pages are never duplicated.
+    """
+    return open_lap_store(os.path.join(DATA_DIR, "lap_store"))
+
+@versioned(kind='resource', ttl=None, max_entries=6)
+def get_shared_table(name):
+    """Memory-mapped Arrow copy of a clean table (data_prep.py --arrow), or None.
+
+    Every worker process maps the same file, so the pages are shared through
+    the OS cache rather than each worker parsing its own copy.
+    """
+    return open_arrow(name, os.path.join(DATA_DIR, "arrow"))
+
+@versioned(kind='resource', ttl=None, max_entries=4)
+def _shared_frame(name):
+    # One zero-copy frame per process; cache_resource returns it without pickling
+    table = get_shared_table(name)
+    return to_frame(table) if table is not None else None
+
+def _report_load_error(name, e):
+    st.error(f"Error loading {name}: {str(e)}")
+    # Optional: Print traceback to logs
+    import traceback
+    print(traceback.format_exc())
+
+@timed()
+def load_results():
+    """Race results, including the position_gain/is_win/is_podium/is_dnf and
+    status_category features derived by data_prep.py.
+
+    With the Arrow store this is the process-wide shared frame, so callers
+    must filter or copy it rather than modify it in place.
+    """
+    shared = _shared_frame('results')
+    if shared is not None:
+        return shared
+    return _load_results()
+
+@versioned(ttl=None, max_entries=2)
+def _load_results():
     try:
-        results = pd.read_csv("data/clean_results.csv")
-        laps = pd.read_csv("data/clean_lap_times.csv")
-        pits = pd.read_csv("data/clean_pit_stops.csv")
-        
-        # Determine status.csv path (cache or local fallback)
-        status_path = "status.csv"
-        # Try finding it in typical cache loc if not local
-        if not os.path.exists(status_path):
-             # Hardcoded fallback or check previous paths
-             pass 
-        
-        # If status.csv exists locally (we might copy it later or user has it), load it.
-        # Otherwise, basic status map.
-        # For this demo, let's create a minimal status map if missing.
-        status_map = {
-            1: "Finished",
-            11: "+1 Lap",
-            12: "+2 Laps",
-            13: "+3 Laps",
-            14: "+4 Laps",
-            15: "+5 Laps",
-            16: "+6 Laps",
-            17: "+7 Laps",
-            18: "+8 Laps",
-            19: "+9 Laps"
-        }
-        
+        results = read_table("results")
+    except Exception as e:
+        _report_load_error("results", e)
+        return None
+    return results
+
+register_warmup(load_results)
+
+@timed()
+def load_pit_stops():
+    """All pit stops; only pages that chart pit stops call this. Shared like load_results."""
+    shared = _shared_frame('pit_stops')
+    if shared is not None:
+        return shared
+    return _load_pit_stops()
+
+@versioned(ttl=None, max_entries=2)
+def _load_pit_stops():
+    try:
+        return read_table("pit_stops")
+    except Exception as e:
+        _report_load_error("pit stops", e)
+        return None
+
+@timed()
+@versioned()
+def load_lap_times(columns=None, years=None):
+    """Lap times, projected to columns/seasons. The largest table: load it last and narrowest."""
+    try:
+        table = get_shared_table('lap_times')
+        if table is not None and set(columns or []) <= set(table.column_names):
+            return to_frame(table, columns, years)
+        return read_table("lap_times", columns=columns, years=years)
     except Exception as e:
-        st.error(f"Error loading data: {str(e)}")
-        # Optional: Print traceback to logs
-        import traceback
-        print(traceback.format_exc())
-        return None, None, None
-
-    # Process Results Features
-    results['position_gain'] = results['grid'] - results['positionOrder']
-    results['is_win'] = (results['positionOrder'] == 1).astype(int)
-    results['is_podium'] = (results['positionOrder'] <= 3).astype(int)
-    
-    # DNF Logic
-    # If statusId is NOT in our "Finished" set (1, 11-19 typically), mark DNF.
-    # Since we might not have status.csv here, let's rely on statusId heuristics for F1 dataset.
-    # IDs 1, 11-19 are finished. Id 5 is Engine, 3 is Accident, etc.
-    finished_ids = [1] + list(range(11, 20))
-    results['is_dnf'] = results['statusId'].apply(lambda x: 0 if x in finished_ids else 1)
-    
-    return results, laps, pits
-
-@st.cache_data
-def get_driver_stats(results):
+        _report_load_error("lap times", e)
+        return None
+
+def load_table_summary():
+    """Row counts and metadata written by data_prep.py, or None if missing."""
+    if not os.path.exists(SUMMARY_PATH):
+        return None
+    with open(SUMMARY_PATH) as f:
+        return json.load(f)
+
+def use_sql_backend():
+    """F1_BACKEND=sqlite routes the query helpers below to data/f1.sqlite (see sql_backend.py)."""
+    return os.environ.get("F1_BACKEND", "pandas") == "sqlite" and sql_backend.database_exists(SQL_DB_PATH)
+
+@timed()
+def data_available():
+    """True when the clean tables (or the SQLite backend) can be read."""
+    if use_sql_backend() or os.path.exists(SUMMARY_PATH):
+        return True
+    return load_results() is not None
+
+@timed()
+@versioned(kind='resource', max_entries=16)
+def load_aggregate(name):
+    """Summary table materialized by data_prep.py (see aggregates.py), or None if
+    it is missing or was built by an older aggregate version."""
+    return read_aggregate(name, os.path.join(DATA_DIR, "aggregates"))
+
+@timed()
+@versioned(kind='resource', warm=True)
+def get_driver_stats():
     """Aggregate driver career statistics."""
-    stats = results.groupby(['driverId', 'driver_name']).agg(
-        total_races=('raceId', 'count'),
-        total_points=('points', 'sum'),
-        wins=('is_win', 'sum'),
-        podiums=('is_podium', 'sum'),
-        dnfs=('is_dnf', 'sum'),
-        avg_finish=('positionOrder', 'mean'),
-        consistency=('positionOrder', 'std'),
-        avg_gain=('position_gain', 'mean')
-    ).reset_index()
-    
-    stats['win_rate'] = stats['wins'] / stats['total_races']
-    stats['podium_rate'] = stats['podiums'] / stats['total_races']
-    stats['dnf_rate'] = stats['dnfs'] / stats['total_races']
-    stats['points_per_race'] = stats['total_points'] / stats['total_races']
-    
-    return stats
-
-@st.cache_data
-def get_constructor_pit_stats(pits, results):
+    stats = load_aggregate('driver_stats')
+    if stats is not None:
+        return stats
+    if use_sql_backend():
+        return add_rates(sql_backend.driver_stats(SQL_DB_PATH))
+    return aggregates.driver_stats(load_results())
+
+@timed()
+@versioned(kind='resource', warm=[(2014,)])
+def get_constructor_pit_stats(min_year=None):
     """Aggregate constructor pit stop performance."""
-    # Ensure pits has constructor info
-    if 'constructor_name' not in pits.columns:
-        driver_team_map = results[['raceId', 'driverId', 'constructor_name']].drop_duplicates()
-        pits = pd.merge(pits, driver_team_map, on=['raceId', 'driverId'], how='inner')
-    
-    # Filter for valid durations (< 40s) for pit stop speed analysis
-    pits_clean = pits[pits['milliseconds'] < 40000].copy()
-    pits_clean['seconds'] = pits_clean['milliseconds'] / 1000
-    
-    return pits_clean
-
-import base64
+    pits = load_aggregate('constructor_pit_stops')
+    if pits is not None:
+        return pits[pits['year'] >= min_year] if min_year is not None else pits
+    if use_sql_backend():
+        return apply_schema(sql_backend.constructor_pit_stops(min_year, db_path=SQL_DB_PATH), 'pit_stops')
+    return aggregates.constructor_pit_stops(load_results(), load_pit_stops(), min_year=min_year)
+
+@timed()
+@versioned(kind='resource', warm=[(10,)])
+def get_circuit_overtaking(min_races=10):
+    """Mean absolute grid-to-finish change per circuit (race name), pit-lane starts excluded."""
+    circuit_stats = load_aggregate('circuit_overtaking')
+    if circuit_stats is not None:
+        return circuit_stats[circuit_stats['races_held'] >= min_races]
+    if use_sql_backend():
+        return sql_backend.circuit_overtaking(min_races, db_path=SQL_DB_PATH)
+    return aggregates.circuit_overtaking(load_results(), min_races=min_races)
+
+@timed()
+@versioned(kind='resource')
+def get_season_points(year):
+    """Per-round points and running season total for every driver in a season."""
+    points = load_aggregate('season_points')
+    if points is not None:
+        return points[points['year'] == year]
+    return aggregates.season_points(get_season_results(year))
+
+@timed()
+@versioned(warm=True)
+def get_seasons():
+    """Seasons with results, newest first."""
+    points = load_aggregate('season_points')
+    if points is not None:
+        return sorted((int(y) for y in points['year'].unique()), reverse=True)
+    if use_sql_backend():
+        return sql_backend.seasons(SQL_DB_PATH)
+    results = load_results()
+    return sorted((int(y) for y in results['year'].unique()), reverse=True)
+
+@timed()
+@versioned(kind='resource')
+def get_season_races(year):
+    """raceId, race_name and round of each race in a season, in calendar order."""
+    points = load_aggregate('season_points')
+    if points is not None:
+        season = points[points['year'] == year]
+        return season[['raceId', 'race_name', 'round']].drop_duplicates().sort_values('round')
+    if use_sql_backend():
+        return sql_backend.season_races(year, db_path=SQL_DB_PATH)
+    results = load_results()
+    season = results[results['year'] == year]
+    return season[['raceId', 'race_name', 'round']].drop_duplicates().sort_values('round')
+
+# Page-level selections, keyed by the filter values a page passes in
+
+@timed()
+@versioned(kind='resource', warm=[(50,)])
+def get_driver_leaderboard(min_races):
+    """Career stats of drivers with at least min_races starts."""
+    stats = get_driver_stats()
+    return stats[stats['total_races'] >= min_races]
+
+@timed()
+@versioned(kind='resource', warm=[(50, 10)])
+def get_top_driver_finishes(min_races, top_n):
+    """Result rows of the top_n career points scorers among drivers with min_races starts."""
+    top_drivers = get_driver_leaderboard(min_races).sort_values('total_points', ascending=False).head(top_n)
+    return get_driver_finishes(tuple(int(d) for d in top_drivers['driverId']))
+
+@timed()
+@versioned(kind='resource', warm=[(50, 10)])
+def get_top_driver_finish_summary(min_races, top_n):
+    """Box plot statistics of finish positions per driver for get_top_driver_finishes."""
+    return aggregates.box_summary(get_top_driver_finishes(min_races, top_n), 'driver_name', 'positionOrder')
+
+def get_driver_standings():
+    """Official driver standings after every round, or None when the source
+    had no driver_standings table."""
+    standings = load_aggregate('driver_standings')
+    if standings is not None:
+        return standings
+    try:
+        return aggregates.driver_standings(read_table('driver_standings'))
+    except FileNotFoundError:
+        return None
+
+@timed()
+@versioned(kind='resource', warm=True)
+def get_standings():
+    """{year: SeasonStandings} of every season, built together (see standings.py)."""
+    points = load_aggregate('season_points')
+    if points is None:
+        points = aggregates.season_points(_all_results())
+    return build_standings(points, get_driver_standings())
+
+@timed()
+@versioned(kind='resource', warm=True)
+def get_title_deciders():
+    """Champion, clinch round and rounds to spare of every season."""
+    return title_deciders(get_standings())
+
+def get_season_standings(year):
+    """One season's standings from get_standings (None for a season without results)."""
+    return get_standings().get(int(year))
+
+@timed()
+@versioned(kind='resource', warm=True)
+def get_rescored_standings():
+    """Every season's standings under each alternative points system (see rescoring.py),
+    with the official standings as the recorded baseline."""
+    return rescore(_all_results(), standings=get_driver_standings())
+
+@timed()
+@versioned(kind='resource', warm=True)
+def get_rescored_champions():
+    """Champion of every season under each points system, flagged where it changes."""
+    return champions(get_rescored_standings())
+
+@timed()
+@versioned(kind='resource')
+def get_title_fight(year, contenders=3):
+    """(contender driverIds by season points, their per-round standings) for a season."""
+    season = get_season_standings(year)
+    top_drivers = season.contenders(contenders)
+    return top_drivers, season.progression(top_drivers)
+
+@timed()
+@versioned(kind='resource', warm=[(2014, 10)])
+def get_top_team_pit_stops(min_year, teams=10):
+    """Pit stops since min_year of the teams with the most stops."""
+    pits = get_constructor_pit_stats(min_year=min_year)
+    top_teams = pits['constructor_name'].value_counts().head(teams).index
+    return pits[pits['constructor_name'].isin(top_teams)]
+
+@timed()
+@versioned(kind='resource', warm=[(2014, 10)])
+def get_top_team_pit_summary(min_year, teams=10):
+    """Box plot statistics of pit lane time per team for get_top_team_pit_stops."""
+    return aggregates.box_summary(get_top_team_pit_stops(min_year, teams), 'constructor_name', 'seconds')
+
+@timed()
+@versioned(kind='resource', warm=[(10, 15)])
+def get_top_overtaking_circuits(min_races, top_n=15):
+    """The top_n race names by overtaking score among those held min_races times."""
+    return get_circuit_overtaking(min_races).sort_values('overtaking_score', ascending=False).head(top_n)
+
+@timed()
+@versioned(kind='resource', warm=True)
+def get_stints():
+    """Every fitted stint of races with pit stop data (see stints.py)."""
+    stints = load_aggregate('stints')
+    if stints is not None:
+        return stints
+    laps = load_lap_times(columns=['raceId', 'driverId', 'lap', 'milliseconds'])
+    if laps is None:
+        return None
+    return apply_schema(stint_table(laps, load_pit_stops(), load_results()), 'stints')
+
+@timed()
+@versioned(kind='resource', warm=[(None, None, 'race_name')])
+def get_degradation_ranking(first_year=None, last_year=None, by='race_name', min_stints=20, top_n=15):
+    """Median fitted degradation (s/lap) per race name or constructor over a season range,
+    most degrading first, for groups with at least min_stints fitted stints."""
+    stints = get_stints()
+    if stints is None:
+        return pd.DataFrame(columns=[by, 'degradation_s_per_lap', 'stints'])
+    fitted = stints[stints['degradation_s_per_lap'].notna()]
+    if first_year is not None:
+        fitted = fitted[fitted['year'] >= first_year]
+    if last_year is not None:
+        fitted = fitted[fitted['year'] <= last_year]
+    ranking = fitted.groupby(by, observed=True).agg(
+        degradation_s_per_lap=('degradation_s_per_lap', 'median'),
+        stints=('stint', 'size'),
+    ).reset_index()
+    ranking = ranking[ranking['stints'] >= min_stints]
+    return ranking.sort_values('degradation_s_per_lap', ascending=False).head(top_n)
+
+def _all_results():
+    """Every result row, from the SQLite backend when it is selected."""
+    if use_sql_backend():
+        return _results_where('year', get_seasons())
+    return load_results()
+
+def _results_where(column, values):
+    if use_sql_backend():
+        return apply_schema(sql_backend.results_where(column, values, db_path=SQL_DB_PATH), 'results')
+    results = load_results()
+    return results[results[column].isin(values)]
+
+@timed()
+@versioned(kind='resource')
+def get_season_results(year):
+    """All result rows of one season."""
+    return _results_where('year', [year])
+
+@timed()
+@versioned(kind='resource')
+def get_race_results(race_id):
+    """All result rows of one race."""
+    return _results_where('raceId', [race_id])
+
+@timed()
+@versioned(kind='resource')
+def get_driver_finishes(driver_ids):
+    """All result rows of the given drivers (pass a tuple so it can be cached)."""
+    return _results_where('driverId', list(driver_ids))
+
+@timed()
+def get_race_laps(race_id, year):
+    """Laps of one race: raceId, driverId, lap, milliseconds (plus position from the lap store)."""
+    if use_sql_backend():
+        return sql_backend.race_laps(race_id, db_path=SQL_DB_PATH)
+
+    lap_store = get_lap_store()
+    if lap_store is not None:
+        return lap_store.race_frame(race_id)
+
+    # Only the selected season is read from disk
+    season_laps = load_lap_times(
+        columns=['raceId', 'driverId', 'lap', 'milliseconds'],
+        years=(int(year),)
+    )
+    if season_laps is None:
+        return pd.DataFrame(columns=['raceId', 'driverId', 'lap', 'milliseconds'])
+    return season_laps[season_laps['raceId'] == race_id].copy()
+
+@timed()
+@versioned(kind='resource')
+def get_race_pace(race_id, year):
+    """Laps of one race with driver_name, seconds and the pace_<w>/ewm_<w> columns
+    for windows 1-10 (see pace.py), so a window change only selects a column."""
+    laps = join_dimensions(get_race_laps(race_id, year), ['driver_name'])
+    return add_pace_columns(laps, windows=WINDOWS, spans=WINDOWS)
+
+def default_season_index(years):
+    """Index of DEFAULT_SEASON in a season picker's options (the first season otherwise)."""
+    return years.index(DEFAULT_SEASON) if DEFAULT_SEASON in years else 0
+
+def warm_page_defaults():
+    """Compute what the season and race pages show before any widget is touched."""
+    years = get_seasons()
+    if not years:
+        return
+    year = years[default_season_index(years)]
+    get_title_fight(year)
+    races = get_season_races(year)
+    if len(races):
+        race_id = int(races['raceId'].iloc[0])
+        get_race_results(race_id)
+        get_race_pace(race_id, year)
+
+register_warmup(warm_page_defaults)
+
+@timed()
+@versioned(warm=True)
+def get_dataset_summary():
+    """Race, driver and lap counts for the landing page.
+
+    Read from data/table_summary.json so the home page never parses lap history.
+    """
+    if use_sql_backend():
+        return sql_backend.dataset_summary(SQL_DB_PATH)
+    summary = load_table_summary()
+    if summary is not None:
+        return {
+            'races': summary['races'],
+            'drivers': summary['drivers'],
+            'laps': summary['tables']['lap_times']['rows']
+        }
+
+    # No summary yet (older export): count laps from a single projected column
+    results = load_results()
+    laps = load_lap_times(columns=['raceId'])
+    return {
+        'races': int(results['raceId'].nunique()),
+        'drivers': int(results['driverId'].nunique()),
+        'laps': len(laps) if laps is not None else 0
+    }
 
 def get_base64_of_bin_file(bin_file):
-    with open(bin_file, 'rb') as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+    """Base64 of a file, encoded once per file version."""
+    return base64_of_file(bin_file)
 
 def inject_custom_css():
     """Inject F1-themed CSS for Streamlit."""
@@ -275,6 +701,42 @@ def inject_custom_css():
     </style>
     """, unsafe_allow_html=True)
 
+@timed()
+def box_figure(summary, outliers, group, value, title=None, labels=None):
+    """Box plot drawn from aggregates.box_summary output, one colored box per group.
+
+    The browser receives five numbers per box plus the outliers instead of
+    every row, so the payload does not grow with the selection.
+    """
+    import plotly.graph_objects as go
+    from plotly.colors import qualitative
+
+    labels = labels or {}
+    colors = qualitative.Plotly
+    fig = go.Figure()
+    for i, row in enumerate(summary.itertuples(index=False)):
+        name = getattr(row, group)
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Box(
+            x=[name], q1=[row.q1], median=[row.median], q3=[row.q3],
+            lowerfence=[row.lowerfence], upperfence=[row.upperfence], mean=[row.mean],
+            name=str(name), marker_color=color, hoverinfo='y'
+        ))
+        points = outliers.loc[outliers[group] == name, value]
+        if len(points):
+            fig.add_trace(go.Scatter(
+                x=[name] * len(points), y=points, mode='markers', name=str(name),
+                marker=dict(color=color, size=5), showlegend=False
+            ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=labels.get(group, group),
+        yaxis_title=labels.get(value, value),
+        showlegend=False
+    )
+    return fig
+
+@timed()
 def format_fig(fig, title=None):
     """Apply consistent F1 dark theme to Plotly charts."""
     fig.update_layout(